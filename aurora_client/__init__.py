@@ -0,0 +1,9 @@
+"""
+AURORA client SDK
+Batching, connection-pooled producers for the AURORA metrics API
+"""
+from aurora_client.client import AuroraClient
+from aurora_client.async_client import AsyncAuroraClient
+from aurora_client._common import OVERFLOW_POLICIES
+
+__all__ = ["AuroraClient", "AsyncAuroraClient", "OVERFLOW_POLICIES"]
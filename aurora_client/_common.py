@@ -0,0 +1,54 @@
+"""
+Shared helpers for the sync and asyncio AURORA clients
+"""
+from typing import Dict, Any, Optional
+from datetime import datetime
+
+# What to do when the in-memory buffer is full
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+BATCH_PATH = "/api/metrics/batch"
+
+# Status codes worth retrying; anything else is a permanent failure
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def build_metric(
+    model_name: str,
+    accuracy: Optional[float] = None,
+    latency_ms: Optional[float] = None,
+    data_drift_score: Optional[float] = None,
+    model_version: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    **fields: Any
+) -> Dict[str, Any]:
+    """Build a /api/metrics payload stamped with the current (event) time"""
+    metric = {
+        "model_name": model_name,
+        "accuracy": accuracy,
+        "latency_ms": latency_ms,
+        "data_drift_score": data_drift_score,
+        "metadata": metadata or {},
+        "timestamp": datetime.utcnow().isoformat(),
+        **fields
+    }
+    if model_version is not None:
+        metric["model_version"] = model_version
+    return metric
+
+
+def stamp(metric: Dict[str, Any]) -> Dict[str, Any]:
+    """Add an event timestamp to a raw payload that lacks one"""
+    if "timestamp" not in metric:
+        metric = {**metric, "timestamp": datetime.utcnow().isoformat()}
+    return metric
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 10.0) -> float:
+    """Exponential backoff for the given zero-based retry attempt"""
+    return min(base * (2 ** attempt), cap)
+
+
+def check_policy(overflow: str):
+    if overflow not in OVERFLOW_POLICIES:
+        raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
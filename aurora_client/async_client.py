@@ -0,0 +1,233 @@
+"""
+Asyncio AURORA client
+Buffers metrics in memory and ships them in batches from a background task
+"""
+from typing import Dict, Any, List, Optional
+from collections import deque
+import asyncio
+import logging
+
+import httpx
+
+from aurora_client._common import (
+    BATCH_PATH,
+    RETRYABLE_STATUS,
+    backoff_delay,
+    build_metric,
+    check_policy,
+    stamp,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAuroraClient:
+    """
+    Batching AURORA client for asyncio applications
+
+    Usage:
+        async with AsyncAuroraClient("http://localhost:8000") as client:
+            await client.log_metrics("my-model", accuracy=0.93, latency_ms=120)
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        overflow: str = "drop_oldest",
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        timeout: float = 10.0,
+        pool_maxsize: int = 4
+    ):
+        """
+        Initialize the client; the sender task starts on first use
+
+        Args:
+            base_url: AURORA API root
+            batch_size: Maximum metrics per /api/metrics/batch request
+            flush_interval: Seconds a metric may wait before being sent
+            max_queue_size: Buffered metrics kept before the overflow policy applies
+            overflow: "drop_oldest", "drop_newest" or "block" when the buffer is full
+            max_retries: Retries for connection errors and retryable statuses
+            retry_backoff: Base delay in seconds for exponential backoff
+            timeout: Per-request timeout in seconds
+            pool_maxsize: Keep-alive connections kept open to the API
+        """
+        check_policy(overflow)
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._buffer = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._flush_requested = False
+        self._closed = False
+
+        self.sent = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.failed = 0
+
+    async def log_metrics(self, model_name: str, **fields: Any) -> bool:
+        """
+        Buffer one metric for the next batch
+
+        Returns:
+            False if the metric was dropped by the overflow policy
+        """
+        return await self.log(build_metric(model_name, **fields))
+
+    async def log(self, metric: Dict[str, Any]) -> bool:
+        """Buffer a raw /api/metrics payload for the next batch"""
+        if self._closed:
+            raise RuntimeError("AsyncAuroraClient is closed")
+        self._ensure_started()
+        metric = stamp(metric)
+
+        if len(self._buffer) >= self.max_queue_size:
+            if self.overflow == "drop_newest":
+                self.dropped += 1
+                return False
+            if self.overflow == "drop_oldest":
+                self._buffer.popleft()
+                self.dropped += 1
+            else:
+                while len(self._buffer) >= self.max_queue_size:
+                    self._space.clear()
+                    await self._space.wait()
+
+        self._buffer.append(metric)
+        self._idle.clear()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send a one-off request over the pooled client, with retries"""
+        self._ensure_started()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._client.request(method, path, **kwargs)
+                if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    return response
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(backoff_delay(attempt, self.retry_backoff))
+
+    async def post(self, path: str, json: Any = None, **kwargs: Any) -> httpx.Response:
+        """POST a JSON body over the pooled client, with retries"""
+        return await self.request("POST", path, json=json, **kwargs)
+
+    async def flush(self):
+        """Send everything buffered so far"""
+        if self._task is None:
+            return
+        self._flush_requested = True
+        self._wakeup.set()
+        await self._idle.wait()
+
+    async def close(self):
+        """Flush buffered metrics, stop the sender task and release connections"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get client delivery statistics"""
+        return {
+            "buffered": len(self._buffer),
+            "sent": self.sent,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+    async def __aenter__(self) -> "AsyncAuroraClient":
+        self._ensure_started()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _ensure_started(self):
+        """Create the pooled HTTP client and sender task inside the running loop"""
+        if self._task is not None:
+            return
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.pool_maxsize,
+                max_keepalive_connections=self.pool_maxsize
+            )
+        )
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """Sender loop: ship a batch when it is full, stale, flushed or closing"""
+        while True:
+            if len(self._buffer) < self.batch_size and not self._flush_requested and not self._closed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+
+            if not self._buffer:
+                self._flush_requested = False
+                self._idle.set()
+                if self._closed:
+                    return
+                continue
+
+            count = min(self.batch_size, len(self._buffer))
+            batch = [self._buffer.popleft() for _ in range(count)]
+            self._space.set()
+            await self._send(batch)
+
+    async def _send(self, batch: List[Dict[str, Any]]):
+        try:
+            response = await self.post(BATCH_PATH, json=batch)
+        except httpx.HTTPError as e:
+            self.failed += len(batch)
+            logger.warning(f"Failed to send {len(batch)} metrics to AURORA: {e}")
+            return
+
+        if response.status_code != 200:
+            self.failed += len(batch)
+            logger.warning(f"AURORA rejected batch of {len(batch)}: HTTP {response.status_code}")
+            return
+
+        result = response.json()
+        self.sent += result.get("inserted", 0)
+        self.rejected += result.get("rejected", 0)
+        for error in result.get("errors", []):
+            logger.warning(f"AURORA rejected metric #{error.get('index')}: {error.get('error')}")
@@ -0,0 +1,254 @@
+"""
+Synchronous AURORA client
+Buffers metrics in memory and ships them in batches from a background thread
+"""
+from typing import Dict, Any, List, Optional
+from collections import deque
+import atexit
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from aurora_client._common import (
+    BATCH_PATH,
+    RETRYABLE_STATUS,
+    backoff_delay,
+    build_metric,
+    check_policy,
+    stamp,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AuroraClient:
+    """
+    Batching AURORA client backed by a keep-alive connection pool
+
+    Usage:
+        client = AuroraClient("http://localhost:8000")
+        client.log_metrics("my-model", accuracy=0.93, latency_ms=120)
+        ...
+        client.close()  # flushes anything still buffered
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        overflow: str = "drop_oldest",
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        timeout: float = 10.0,
+        pool_maxsize: int = 4
+    ):
+        """
+        Initialize the client and start its sender thread
+
+        Args:
+            base_url: AURORA API root
+            batch_size: Maximum metrics per /api/metrics/batch request
+            flush_interval: Seconds a metric may wait before being sent
+            max_queue_size: Buffered metrics kept before the overflow policy applies
+            overflow: "drop_oldest", "drop_newest" or "block" when the buffer is full
+            max_retries: Retries for connection errors and retryable statuses
+            retry_backoff: Base delay in seconds for exponential backoff
+            timeout: Per-request timeout in seconds
+            pool_maxsize: Keep-alive connections kept open to the API
+        """
+        check_policy(overflow)
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+
+        self.sent = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._run, name="aurora-client", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log_metrics(self, model_name: str, **fields: Any) -> bool:
+        """
+        Buffer one metric for the next batch
+
+        Returns:
+            False if the metric was dropped by the overflow policy
+        """
+        return self.log(build_metric(model_name, **fields))
+
+    def log(self, metric: Dict[str, Any]) -> bool:
+        """Buffer a raw /api/metrics payload for the next batch"""
+        metric = stamp(metric)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AuroraClient is closed")
+
+            if len(self._buffer) >= self.max_queue_size:
+                if self.overflow == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.overflow == "drop_oldest":
+                    self._buffer.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._buffer) >= self.max_queue_size and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        raise RuntimeError("AuroraClient is closed")
+
+            self._buffer.append(metric)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+
+        return True
+
+    def request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        """Send a one-off request over the pooled session, with retries"""
+        kwargs.setdefault("timeout", self.timeout)
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._session.request(method, url, **kwargs)
+                if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    return response
+            except requests.exceptions.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+            except requests.exceptions.Timeout:
+                if attempt == self.max_retries:
+                    raise
+            time.sleep(backoff_delay(attempt, self.retry_backoff))
+
+    def post(self, path: str, json: Any = None, **kwargs: Any) -> requests.Response:
+        """POST a JSON body over the pooled session, with retries"""
+        return self.request("POST", path, json=json, **kwargs)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Send everything buffered so far
+
+        Returns:
+            True if the buffer drained before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._buffer or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0):
+        """Flush buffered metrics, stop the sender thread and release connections"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+        self._thread.join(timeout)
+        self._session.close()
+        atexit.unregister(self.close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get client delivery statistics"""
+        with self._cond:
+            buffered = len(self._buffer)
+        return {
+            "buffered": buffered,
+            "sent": self.sent,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+    def __enter__(self) -> "AuroraClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        """Sender loop: ship a batch when it is full, stale, flushed or closing"""
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while (
+                    len(self._buffer) < self.batch_size
+                    and not self._flush_requested
+                    and not self._closed
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 and self._buffer:
+                        break
+                    if remaining <= 0:
+                        deadline = time.monotonic() + self.flush_interval
+                        remaining = self.flush_interval
+                    self._cond.wait(remaining)
+
+                if not self._buffer:
+                    self._flush_requested = False
+                    self._cond.notify_all()
+                    if self._closed:
+                        return
+                    continue
+
+                count = min(self.batch_size, len(self._buffer))
+                batch = [self._buffer.popleft() for _ in range(count)]
+                self._in_flight = count
+                self._cond.notify_all()
+
+            self._send(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _send(self, batch: List[Dict[str, Any]]):
+        try:
+            response = self.post(BATCH_PATH, json=batch)
+        except requests.exceptions.RequestException as e:
+            self.failed += len(batch)
+            logger.warning(f"Failed to send {len(batch)} metrics to AURORA: {e}")
+            return
+
+        if response.status_code != 200:
+            self.failed += len(batch)
+            logger.warning(f"AURORA rejected batch of {len(batch)}: HTTP {response.status_code}")
+            return
+
+        result = response.json()
+        self.sent += result.get("inserted", 0)
+        self.rejected += result.get("rejected", 0)
+        for error in result.get("errors", []):
+            logger.warning(f"AURORA rejected metric #{error.get('index')}: {error.get('error')}")
@@ -3,7 +3,7 @@ AURORA Configuration Module
 Centralized configuration management for the entire system
 """
 import os
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -31,6 +31,84 @@ class Settings(BaseSettings):
     postgres_user: str = "aurora_user"
     postgres_password: Optional[str] = None
     postgres_db: str = "aurora"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_statement_timeout_ms: int = 30000
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_cache_size_kb: int = 65536
+    sqlite_busy_timeout_ms: int = 5000
+    
+    # Metrics Ingestion
+    metrics_batch_max_size: int = 10000
+    metrics_ingest_mode: str = "sync"  # sync | buffered (write-behind group commit)
+    metrics_buffer_max_size: int = 50000
+    metrics_flush_batch_size: int = 1000
+    metrics_flush_interval_ms: int = 200
+    metrics_enqueue_timeout_ms: int = 1000
+    metrics_stream_commit_size: int = 500
+    metrics_stream_commit_interval_ms: int = 1000
+    metrics_stream_max_line_bytes: int = 65536
+    metrics_stream_max_errors: int = 100
+    metrics_rollup_min_points: int = 60
+    metrics_export_chunk_size: int = 10000
+    
+    # Retention (raw rows older than the limit move to Parquet archives)
+    retention_enabled: bool = False
+    metrics_retention_days: int = 30
+    decisions_retention_days: int = 90
+    retention_interval_minutes: int = 60
+    retention_batch_size: int = 5000
+    archive_dir: str = "./archive"
+    archive_compression: str = "zstd"
+    
+    # Embeddings (encode requests arriving within the window share one forward pass)
+    embedding_model_name: str = "all-MiniLM-L6-v2"
+    # torch (sentence-transformers) | onnx (ONNX Runtime, int8); switching re-embeds stored memories
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: str = "./models/all-MiniLM-L6-v2-onnx"  # built by scripts/export_onnx_encoder.py
+    embedding_onnx_threads: int = 0  # 0 = ONNX Runtime default
+    embedding_dimension: int = 384
+    embedding_warmup: bool = True  # load the model in the background at startup
+    embedding_batch_window_ms: int = 5
+    embedding_max_batch_size: int = 64
+    embedding_workers: int = 1
+    embedding_cache_size: int = 4096
+    embedding_cache_ttl_s: int = 3600
+    
+    # Memory store persistence (FAISS snapshots + metadata; empty keeps memory in RAM)
+    memory_store_dir: Optional[str] = "./memory_store"
+    memory_snapshot_interval_s: int = 300
+    memory_index_type: str = "flat"  # flat | hnsw | ivf | sq8 | pq | ivf_sq8 | ivf_pq (rebuilt online when changed)
+    memory_hnsw_m: int = 32
+    memory_hnsw_ef_construction: int = 80
+    memory_hnsw_ef_search: int = 64
+    memory_ivf_nlist: int = 256
+    memory_ivf_nprobe: int = 16
+    memory_pq_m: int = 48  # PQ sub-quantizers = bytes per vector (must divide the dimension)
+    memory_index_train_threshold: int = 20000  # trained types stay flat until the store is this large
+    memory_rerank_factor: int = 4  # quantized indexes: candidates re-scored exactly per result
+    memory_filter_exact_max: int = 5000  # filtered searches matching fewer memories are scored exactly
+    memory_filter_overfetch: int = 4  # candidates per result when filtering on non-indexed fields
+    memory_dedup_threshold: float = 0.97  # cosine similarity treated as the same memory (0 disables)
+    memory_search_batch_max_size: int = 100
+    memory_search_mode: str = "hybrid"  # hybrid (vector + BM25) | vector | keyword
+    memory_rrf_k: int = 60  # reciprocal rank fusion constant
+    memory_search_workers: int = 0  # threads for index searches and writes (0 = one per core)
+    memory_recency_weight: float = 0.3  # share of the score that decays with age (0 disables)
+    memory_recency_half_life_hours: float = 168
+    
+    # Memory retention (0 = unlimited; per-type overrides e.g. {"experiment": {"max_age_days": 30}})
+    memory_max_age_days: int = 0
+    memory_max_count: int = 0
+    memory_retention_policies: Dict[str, Dict[str, int]] = {}
+    memory_eviction_interval_minutes: int = 60
+    memory_compaction_threshold: float = 0.2  # deleted/superseded share of the base that triggers an early snapshot
+    
+    # Memory rehydration (re-create memories for agent_decisions / experiment_logs rows at startup)
+    memory_rehydrate_on_startup: bool = True
+    memory_rehydrate_chunk_size: int = 500
     
     # Pinecone (Optional)
     pinecone_api_key: Optional[str] = None
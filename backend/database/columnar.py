@@ -0,0 +1,74 @@
+"""
+Arrow conversion for database models
+Maps SQLAlchemy columns to Arrow types for Parquet archives and columnar exports
+"""
+from typing import Any, Dict, Iterable, List, Sequence
+import json
+
+import pyarrow as pa
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, String, Text
+
+
+def arrow_type(column: Any) -> pa.DataType:
+    """Arrow type for a SQLAlchemy column (JSON is stored as text)"""
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, (String, Text, JSON)):
+        return pa.string()
+    raise TypeError(f"No Arrow mapping for column {column.name} ({column_type})")
+
+
+def arrow_schema(model: Any, columns: Sequence[str] = None) -> pa.Schema:
+    """Arrow schema for a model, optionally restricted to some columns"""
+    table_columns = model.__table__.columns
+    names = columns or [c.name for c in table_columns]
+    return pa.schema([pa.field(name, arrow_type(table_columns[name])) for name in names])
+
+
+def record_batch(schema: pa.Schema, rows: Iterable[Sequence[Any]]) -> pa.RecordBatch:
+    """
+    Build a record batch from row tuples ordered like the schema fields
+
+    JSON values are serialized to text so archives stay schema-stable.
+    """
+    columns: List[List[Any]] = [[] for _ in schema]
+    json_columns = [
+        i for i, field in enumerate(schema)
+        if pa.types.is_string(field.type)
+    ]
+
+    for row in rows:
+        for i, value in enumerate(row):
+            columns[i].append(value)
+
+    for i in json_columns:
+        columns[i] = [
+            v if v is None or isinstance(v, str) else json.dumps(v)
+            for v in columns[i]
+        ]
+
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+def model_rows(instances: Iterable[Any], schema: pa.Schema) -> List[tuple]:
+    """Extract schema-ordered tuples from ORM instances"""
+    names = schema.names
+    return [tuple(getattr(instance, name) for name in names) for instance in instances]
+
+
+def decode_json_columns(model: Any, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn archived JSON text back into Python objects"""
+    for column in model.__table__.columns:
+        if isinstance(column.type, JSON) and isinstance(row.get(column.name), str):
+            row[column.name] = json.loads(row[column.name])
+    return row
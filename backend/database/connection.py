@@ -1,40 +1,220 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 import logging
+import time
 
 from backend.config import settings
 from backend.database.models import Base
 
 logger = logging.getLogger(__name__)
 
+
+class _WaitStatsMixin:
+    """Record how long callers wait to check a connection out of the pool"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_count = getattr(self, "wait_count", 0) + 1
+            self.wait_total = getattr(self, "wait_total", 0.0) + waited
+            self.wait_max = max(getattr(self, "wait_max", 0.0), waited)
+
+
+class TimedQueuePool(_WaitStatsMixin, QueuePool):
+    """QueuePool with checkout wait-time statistics"""
+
+
+class TimedAsyncQueuePool(_WaitStatsMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait-time statistics"""
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL onto its asyncio driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg:" + url[len(prefix):]
+    return url
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Backend-specific engine profile, selected from the database URL
+    
+    SQLite: pooled connections shared across threads; pragmas are set on
+    connect (see _apply_sqlite_pragmas). Postgres: pool sized from
+    settings and a server-side statement timeout.
+    """
+    options = {
+        "echo": settings.environment == "development",
+        "pool_pre_ping": True,
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    
+    if is_sqlite(url):
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        if ":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+aiosqlite:"):
+            # In-memory databases exist per connection; keep the driver defaults.
+            for key in ("poolclass", "pool_size", "max_overflow", "pool_timeout"):
+                options.pop(key)
+        return options
+    
+    options["pool_recycle"] = settings.db_pool_recycle
+    options["pool_use_lifo"] = True  # let idle connections above the steady load time out
+    timeout = str(settings.db_statement_timeout_ms)
+    if is_async:
+        options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+    else:
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL journal and relaxed fsync so concurrent writers stop serializing"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _configure(engine: Engine, url: str):
+    if is_sqlite(url):
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+
+
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.environment == "development",
-    pool_pre_ping=True,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+_configure(engine, settings.database_url)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers, so queries do not block the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    **engine_options(settings.database_url, is_async=True)
+)
+_configure(async_engine.sync_engine, settings.database_url)
+
+# Async session factory; objects stay readable after commit
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection pool statistics for the sync and async engines"""
+    return {
+        "backend": engine.dialect.name,
+        "sync": _pool_stats(engine.pool),
+        "async": _pool_stats(async_engine.pool)
+    }
+
+
+def _pool_stats(pool: Pool) -> Dict[str, Any]:
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    
+    wait_count = getattr(pool, "wait_count", 0)
+    if wait_count:
+        stats.update({
+            "checkouts": wait_count,
+            "avg_wait_ms": getattr(pool, "wait_total", 0.0) / wait_count * 1000,
+            "max_wait_ms": getattr(pool, "wait_max", 0.0) * 1000,
+        })
+    return stats
+
 
 def init_db():
     """Initialize database tables"""
     try:
         Base.metadata.create_all(bind=engine)
+        _ensure_indexes()
+        _normalize_sqlite_timestamps()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
 
 
+# Indexes replaced by wider ones (covered by the indexes that superseded them)
+SUPERSEDED_INDEXES = (
+    "ix_model_metrics_model_name_timestamp",
+    "ix_model_metrics_timestamp",
+    "ix_agent_decisions_timestamp",
+)
+
+
+def _ensure_indexes():
+    """Create indexes added to models after their tables already existed"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    with engine.begin() as conn:
+        for name in SUPERSEDED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+
+# Tables paged by (timestamp, id) keyset cursors
+KEYSET_TABLES = ("model_metrics", "agent_decisions")
+
+# PRAGMA user_version once SQLite timestamps have been normalized
+SQLITE_TIMESTAMPS_VERSION = 1
+
+
+def _normalize_sqlite_timestamps(bind: Optional[Engine] = None):
+    """
+    Rewrite SQLite timestamps stored by the server default (no fraction), once
+    
+    SQLite compares the text as stored; "YYYY-MM-DD HH:MM:SS" sorts before
+    the "YYYY-MM-DD HH:MM:SS.ffffff" that cursors are bound as, so rows
+    written before timestamps were set client-side would page wrongly.
+    The scan runs only while the database's user_version is below
+    SQLITE_TIMESTAMPS_VERSION; new rows are written in the right format.
+    """
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as conn:
+        if conn.exec_driver_sql("PRAGMA user_version").scalar() >= SQLITE_TIMESTAMPS_VERSION:
+            return
+        for table in KEYSET_TABLES:
+            conn.exec_driver_sql(
+                f"UPDATE {table} SET timestamp = timestamp || '.000000' WHERE length(timestamp) = 19"
+            )
+        conn.exec_driver_sql(f"PRAGMA user_version = {SQLITE_TIMESTAMPS_VERSION}")
+
+
 @contextmanager
 def get_db() -> Generator[Session, None, None]:
     """
@@ -68,3 +248,15 @@ def get_db_session() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get async database session for FastAPI dependency injection
+    Usage in FastAPI:
+        @app.get("/")
+        async def endpoint(db: AsyncSession = Depends(get_async_db_session)):
+            result = await db.execute(select(Model))
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
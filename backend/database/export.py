@@ -0,0 +1,118 @@
+"""
+Columnar export of metric history
+Streams ModelMetrics as Arrow IPC or Parquet straight from a database cursor
+"""
+from typing import Iterator, Optional
+from datetime import datetime
+import logging
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+
+from backend.database.columnar import arrow_schema, record_batch
+from backend.database.connection import get_db
+from backend.database.models import ModelMetrics
+
+logger = logging.getLogger(__name__)
+
+# Supported export formats: (media type, file extension)
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_metrics(
+    fmt: str = "arrow",
+    model_name: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    chunk_size: int = 10000
+) -> Iterator[bytes]:
+    """
+    Stream model metrics in a columnar format
+
+    Rows are read through a server-side cursor chunk_size at a time and
+    each chunk becomes one Arrow record batch (or Parquet row group)
+    that is yielded as soon as it is encoded, so memory stays flat for
+    any history length. Arrow IPC output can be loaded with
+    pyarrow.ipc.open_stream and converted to pandas/NumPy without copying
+    the numeric columns.
+
+    Args:
+        fmt: "arrow" (IPC stream) or "parquet"
+        model_name: Optional model filter
+        start: Optional inclusive lower timestamp bound
+        end: Optional exclusive upper timestamp bound
+        chunk_size: Rows fetched and encoded per batch
+
+    Yields:
+        Encoded bytes
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {list(EXPORT_FORMATS)}")
+
+    schema = arrow_schema(ModelMetrics)
+    table = ModelMetrics.__table__
+    stmt = select(*[table.c[name] for name in schema.names]).order_by(table.c.id)
+    if model_name:
+        stmt = stmt.where(table.c.model_name == model_name)
+    if start:
+        stmt = stmt.where(table.c.timestamp >= start)
+    if end:
+        stmt = stmt.where(table.c.timestamp < end)
+
+    sink = _ChunkSink()
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, schema)
+    else:
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    total = 0
+    with get_db() as db:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+        for partition in result.partitions():
+            batch = record_batch(schema, partition)
+            if fmt == "arrow":
+                writer.write_batch(batch)
+            else:
+                writer.write_table(pa.Table.from_batches([batch]))
+            total += batch.num_rows
+
+            data = sink.drain()
+            if data:
+                yield data
+
+    writer.close()
+    yield sink.drain()
+    logger.info(f"Exported {total} metrics as {fmt}")
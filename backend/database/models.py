@@ -1,7 +1,7 @@
 """
 Database models for AURORA system state tracking
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Boolean, Text, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -12,11 +12,17 @@ Base = declarative_base()
 class ModelMetrics(Base):
     """Track model performance metrics over time"""
     __tablename__ = "model_metrics"
+    __table_args__ = (
+        # Serve "latest N" listings and keyset pages (timestamp, id) from the index order
+        Index("ix_model_metrics_model_name_timestamp_id", "model_name", "timestamp", "id"),
+        Index("ix_model_metrics_timestamp_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     model_name = Column(String(255), index=True, nullable=False)
     model_version = Column(String(100), nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Set client-side so SQLite stores the same text format cursors are bound in
+    timestamp = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     
     # Performance metrics
     accuracy = Column(Float)
@@ -33,12 +39,51 @@ class ModelMetrics(Base):
     meta_data = Column(JSON)
 
 
+class MetricRollup(Base):
+    """Downsampled model metrics per model version and time bucket"""
+    __tablename__ = "model_metrics_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "resolution", "model_name", "model_version", "bucket_start",
+            name="uq_model_metrics_rollups_bucket"
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    resolution = Column(String(8), nullable=False)  # 1m, 1h, 1d
+    model_name = Column(String(255), nullable=False)
+    model_version = Column(String(100), nullable=False)
+    bucket_start = Column(DateTime(), nullable=False)  # naive UTC, part of the upsert key
+    
+    # Points in the bucket
+    count = Column(Integer, nullable=False, default=0)
+    
+    # Per-metric aggregates (count excludes points where the metric was null)
+    accuracy_count = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0.0)
+    accuracy_min = Column(Float)
+    accuracy_max = Column(Float)
+    
+    latency_ms_count = Column(Integer, nullable=False, default=0)
+    latency_ms_sum = Column(Float, nullable=False, default=0.0)
+    latency_ms_min = Column(Float)
+    latency_ms_max = Column(Float)
+    
+    data_drift_score_count = Column(Integer, nullable=False, default=0)
+    data_drift_score_sum = Column(Float, nullable=False, default=0.0)
+    data_drift_score_min = Column(Float)
+    data_drift_score_max = Column(Float)
+
+
 class AgentDecision(Base):
     """Log all agent decisions for audit and learning"""
     __tablename__ = "agent_decisions"
+    __table_args__ = (
+        Index("ix_agent_decisions_timestamp_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     
     # Agent information
     agent_type = Column(String(50), nullable=False)  # planner, critic, executor
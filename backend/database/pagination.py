@@ -0,0 +1,103 @@
+"""
+Keyset (cursor) pagination over (timestamp, id)
+Deep pages cost the same as the first page because no rows are skipped
+"""
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+import base64
+
+from sqlalchemy import Select, and_, or_
+
+# Largest page the API serves
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Encode a row position as an opaque cursor"""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor (raises ValueError if malformed)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_statement(
+    stmt: Select,
+    timestamp_column: Any,
+    id_column: Any,
+    limit: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None
+) -> Select:
+    """
+    Restrict and order a select for one page, newest first
+
+    Args:
+        stmt: Base select (filters already applied)
+        timestamp_column: Column the listing is sorted on
+        id_column: Unique tie-breaker column
+        limit: Page size (at least 1); one extra row is fetched to detect more pages
+        before: Cursor - return rows older than this position
+        after: Cursor - return rows newer than this position
+    """
+    if before and after:
+        raise ValueError("Use either before or after, not both")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    if before:
+        timestamp, row_id = decode_cursor(before)
+        stmt = stmt.where(
+            timestamp_column <= timestamp,
+            or_(timestamp_column < timestamp, and_(timestamp_column == timestamp, id_column < row_id))
+        )
+    elif after:
+        timestamp, row_id = decode_cursor(after)
+        stmt = stmt.where(
+            timestamp_column >= timestamp,
+            or_(timestamp_column > timestamp, and_(timestamp_column == timestamp, id_column > row_id))
+        )
+
+    if after:
+        stmt = stmt.order_by(timestamp_column.asc(), id_column.asc())
+    else:
+        stmt = stmt.order_by(timestamp_column.desc(), id_column.desc())
+
+    return stmt.limit(limit + 1)
+
+
+def keyset_page(
+    rows: List[Any],
+    limit: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None
+) -> Tuple[List[Any], Optional[str], Optional[str]]:
+    """
+    Trim the rows of a keyset_statement query into a page
+
+    Rows must expose .timestamp and .id.
+
+    Returns:
+        (rows newest first, next_cursor for older rows, prev_cursor for newer rows)
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if after:
+        rows.reverse()
+        older = bool(rows)
+        newer = has_more
+    else:
+        older = has_more
+        newer = bool(before) and bool(rows)
+
+    next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if older else None
+    prev_cursor = encode_cursor(rows[0].timestamp, rows[0].id) if newer else None
+    return rows, next_cursor, prev_cursor
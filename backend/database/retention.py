@@ -0,0 +1,191 @@
+"""
+Retention and archival of raw history
+Moves old model_metrics / agent_decisions rows into date-partitioned Parquet files
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+from collections import defaultdict
+import logging
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import delete, select
+
+from backend.config import settings
+from backend.database.columnar import arrow_schema, decode_json_columns, model_rows, record_batch
+from backend.database.connection import get_db
+from backend.database.models import AgentDecision, ModelMetrics
+
+logger = logging.getLogger(__name__)
+
+# Tables under retention, by table name
+ARCHIVED_MODELS = {
+    ModelMetrics.__tablename__: ModelMetrics,
+    AgentDecision.__tablename__: AgentDecision,
+}
+
+
+def retention_days(table: str) -> int:
+    """Configured maximum age for a table"""
+    if table == ModelMetrics.__tablename__:
+        return settings.metrics_retention_days
+    return settings.decisions_retention_days
+
+
+def archive_table(
+    table: str,
+    cutoff: datetime,
+    archive_dir: str,
+    batch_size: int = 5000,
+    compression: str = "zstd"
+) -> int:
+    """
+    Archive and delete rows older than cutoff, one batch per transaction
+
+    Each batch is written to Parquet (one file per day) before its rows
+    are deleted, so a crash can at worst leave a batch archived but not
+    yet deleted; the next run archives it again, normally into the same
+    file name.
+
+    Returns:
+        Number of rows archived
+    """
+    model = ARCHIVED_MODELS[table]
+    schema = arrow_schema(model)
+    total = 0
+
+    while True:
+        with get_db() as db:
+            rows = db.execute(
+                select(model)
+                .where(model.timestamp < cutoff)
+                .order_by(model.id)
+                .limit(batch_size)
+            ).scalars().all()
+
+            if not rows:
+                break
+
+            by_day = defaultdict(list)
+            for row in rows:
+                by_day[row.timestamp.date()].append(row)
+
+            for day, day_rows in by_day.items():
+                batch = record_batch(schema, model_rows(day_rows, schema))
+                _write_partition(archive_dir, table, day, batch, compression)
+
+            db.execute(
+                delete(model)
+                .where(model.id.in_([row.id for row in rows]))
+                .execution_options(synchronize_session=False)
+            )
+            total += len(rows)
+
+    if total:
+        logger.info(f"Archived {total} rows from {table} older than {cutoff.isoformat()}")
+    return total
+
+
+def run_retention() -> Dict[str, int]:
+    """Apply the configured retention policy to every archived table"""
+    now = datetime.utcnow()
+    return {
+        table: archive_table(
+            table,
+            now - timedelta(days=retention_days(table)),
+            settings.archive_dir,
+            batch_size=settings.retention_batch_size,
+            compression=settings.archive_compression
+        )
+        for table in ARCHIVED_MODELS
+    }
+
+
+def read_archive(
+    table: str,
+    archive_dir: str,
+    limit: int,
+    before: Optional[Tuple[datetime, int]] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Read archived rows newest first, continuing a (timestamp, id) keyset
+
+    Only day partitions at or before the cursor are opened, newest
+    first, and reading stops as soon as limit rows are collected.
+
+    Args:
+        table: Archived table name
+        archive_dir: Archive root
+        limit: Maximum rows to return
+        before: Return rows strictly older than this (timestamp, id)
+        filters: Optional column equality filters (e.g. model_name)
+
+    Returns:
+        Row dictionaries with JSON columns decoded
+    """
+    model = ARCHIVED_MODELS[table]
+    root = os.path.join(archive_dir, table)
+    if limit <= 0 or not os.path.isdir(root):
+        return []
+
+    days = sorted(
+        (name[len("date="):] for name in os.listdir(root) if name.startswith("date=")),
+        reverse=True
+    )
+    if before is not None:
+        days = [day for day in days if day <= before[0].date().isoformat()]
+
+    results = []
+    for day in days:
+        partition = pq.ParquetDataset(
+            os.path.join(root, f"date={day}"),
+            filters=_archive_filters(filters, before)
+        ).read()
+        if partition.num_rows == 0:
+            continue
+
+        partition = partition.sort_by([("timestamp", "descending"), ("id", "descending")])
+        for row in partition.slice(0, limit - len(results)).to_pylist():
+            results.append(decode_json_columns(model, row))
+        if len(results) >= limit:
+            break
+
+    return results
+
+
+def _archive_filters(
+    filters: Optional[Dict[str, Any]],
+    before: Optional[Tuple[datetime, int]]
+) -> Optional[List[List[tuple]]]:
+    """Build DNF filters: column equality plus the keyset bound"""
+    equality = [(column, "=", value) for column, value in (filters or {}).items() if value is not None]
+    if before is None:
+        return [equality] if equality else None
+
+    timestamp, row_id = before
+    return [
+        equality + [("timestamp", "<", timestamp)],
+        equality + [("timestamp", "=", timestamp), ("id", "<", row_id)],
+    ]
+
+
+def _write_partition(
+    archive_dir: str,
+    table: str,
+    day: Any,
+    batch: pa.RecordBatch,
+    compression: str
+):
+    """Atomically write one archived batch into its day partition"""
+    directory = os.path.join(archive_dir, table, f"date={day.isoformat()}")
+    os.makedirs(directory, exist_ok=True)
+
+    ids = batch.column("id")
+    name = f"part-{ids[0].as_py()}-{ids[-1].as_py()}.parquet"
+    path = os.path.join(directory, name)
+    tmp_path = os.path.join(directory, f".{name}.tmp")  # hidden files are ignored by readers
+
+    pq.write_table(pa.Table.from_batches([batch]), tmp_path, compression=compression)
+    os.replace(tmp_path, path)
@@ -0,0 +1,260 @@
+"""
+Downsampled metric rollups
+Maintains 1-minute, 1-hour and 1-day aggregates of model metrics as they are ingested
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import logging
+
+from sqlalchemy import case, delete, select
+from sqlalchemy.orm import Session
+
+from backend.database.models import MetricRollup, ModelMetrics
+
+logger = logging.getLogger(__name__)
+
+# Bucket widths, coarsest first
+RESOLUTIONS = {
+    "1d": timedelta(days=1),
+    "1h": timedelta(hours=1),
+    "1m": timedelta(minutes=1),
+}
+
+# Metric columns aggregated into every bucket
+ROLLUP_FIELDS = ("accuracy", "latency_ms", "data_drift_score")
+
+_KEY_COLUMNS = ("resolution", "model_name", "model_version", "bucket_start")
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Truncate a timestamp to the start of its bucket (as naive UTC, the stored form)"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    if resolution == "1d":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == "1h":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(second=0, microsecond=0)
+
+
+def update_rollups(db: Session, rows: List[Dict[str, Any]]):
+    """
+    Fold freshly ingested metric rows into every rollup resolution
+
+    Rows are pre-aggregated per bucket and merged with a single upsert per
+    batch, inside the caller's transaction.
+
+    Args:
+        db: Database session
+        rows: Metric rows (as produced by parse_metric) with a timestamp
+    """
+    buckets = _aggregate(rows)
+    if not buckets:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        _upsert(db, dialect, list(buckets.values()))
+    else:
+        _merge(db, buckets)
+
+
+def choose_resolution(start: datetime, end: datetime, min_points: int) -> str:
+    """
+    Pick the coarsest resolution that still yields min_points buckets
+
+    Falls back to the finest resolution for very short ranges.
+    """
+    span = end - start
+    for resolution, width in RESOLUTIONS.items():
+        if span / width >= min_points:
+            return resolution
+    return "1m"
+
+
+def query_rollups(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    model_name: Optional[str] = None,
+    model_version: Optional[str] = None,
+    resolution: Optional[str] = None,
+    min_points: int = 60
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Read rollup buckets for a time range
+
+    Args:
+        db: Database session
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+        model_name: Optional model filter
+        model_version: Optional version filter
+        resolution: Force a resolution instead of choosing one
+        min_points: Buckets wanted when choosing a resolution
+
+    Returns:
+        (resolution used, buckets ordered by time)
+    """
+    if resolution is None:
+        resolution = choose_resolution(start, end, min_points)
+    elif resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {list(RESOLUTIONS)}")
+
+    stmt = select(MetricRollup).where(
+        MetricRollup.resolution == resolution,
+        MetricRollup.bucket_start >= bucket_start(start, resolution),
+        MetricRollup.bucket_start < end
+    )
+    if model_name:
+        stmt = stmt.where(MetricRollup.model_name == model_name)
+    if model_version:
+        stmt = stmt.where(MetricRollup.model_version == model_version)
+    stmt = stmt.order_by(MetricRollup.bucket_start, MetricRollup.model_name, MetricRollup.model_version)
+
+    return resolution, [rollup_to_dict(r) for r in db.execute(stmt).scalars()]
+
+
+def rollup_to_dict(rollup: MetricRollup) -> Dict[str, Any]:
+    """Serialize a rollup bucket with derived means"""
+    result = {
+        "bucket_start": rollup.bucket_start.isoformat(),
+        "model_name": rollup.model_name,
+        "model_version": rollup.model_version,
+        "count": rollup.count,
+    }
+    for field in ROLLUP_FIELDS:
+        count = getattr(rollup, f"{field}_count")
+        result[field] = {
+            "count": count,
+            "mean": getattr(rollup, f"{field}_sum") / count if count else None,
+            "min": getattr(rollup, f"{field}_min"),
+            "max": getattr(rollup, f"{field}_max"),
+        }
+    return result
+
+
+def backfill_rollups(db: Session, chunk_size: int = 5000) -> int:
+    """
+    Rebuild all rollups from the raw model_metrics table
+
+    Returns:
+        Number of raw rows folded in
+    """
+    db.execute(delete(MetricRollup))
+
+    columns = [
+        ModelMetrics.model_name,
+        ModelMetrics.model_version,
+        ModelMetrics.timestamp,
+    ] + [getattr(ModelMetrics, field) for field in ROLLUP_FIELDS]
+
+    total = 0
+    result = db.execute(
+        select(*columns).execution_options(yield_per=chunk_size)
+    )
+    for partition in result.partitions():
+        update_rollups(db, [row._asdict() for row in partition])
+        total += len(partition)
+
+    logger.info(f"Backfilled rollups from {total} metrics")
+    return total
+
+
+def _aggregate(rows: List[Dict[str, Any]]) -> Dict[tuple, Dict[str, Any]]:
+    """Pre-aggregate rows per (resolution, model, version, bucket)"""
+    buckets = {}
+    for row in rows:
+        timestamp = row.get("timestamp")
+        if timestamp is None:
+            continue
+
+        for resolution in RESOLUTIONS:
+            key = (
+                resolution,
+                row.get("model_name") or "unknown",
+                row.get("model_version") or "1.0",
+                bucket_start(timestamp, resolution),
+            )
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = dict(zip(_KEY_COLUMNS, key))
+                bucket["count"] = 0
+                for field in ROLLUP_FIELDS:
+                    bucket[f"{field}_count"] = 0
+                    bucket[f"{field}_sum"] = 0.0
+                    bucket[f"{field}_min"] = None
+                    bucket[f"{field}_max"] = None
+                buckets[key] = bucket
+
+            bucket["count"] += 1
+            for field in ROLLUP_FIELDS:
+                value = row.get(field)
+                if value is None:
+                    continue
+                bucket[f"{field}_count"] += 1
+                bucket[f"{field}_sum"] += value
+                low = bucket[f"{field}_min"]
+                high = bucket[f"{field}_max"]
+                bucket[f"{field}_min"] = value if low is None else min(low, value)
+                bucket[f"{field}_max"] = value if high is None else max(high, value)
+
+    return buckets
+
+
+def _upsert(db: Session, dialect: str, buckets: List[Dict[str, Any]]):
+    """Merge buckets with INSERT ... ON CONFLICT DO UPDATE"""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = MetricRollup.__table__
+    stmt = insert(table)
+    new = stmt.excluded
+
+    updates = {"count": table.c["count"] + new["count"]}
+    for field in ROLLUP_FIELDS:
+        for part in ("count", "sum"):
+            column = f"{field}_{part}"
+            updates[column] = table.c[column] + new[column]
+
+        low = f"{field}_min"
+        updates[low] = case(
+            (table.c[low].is_(None), new[low]),
+            (new[low] < table.c[low], new[low]),
+            else_=table.c[low]
+        )
+        high = f"{field}_max"
+        updates[high] = case(
+            (table.c[high].is_(None), new[high]),
+            (new[high] > table.c[high], new[high]),
+            else_=table.c[high]
+        )
+
+    stmt = stmt.on_conflict_do_update(index_elements=list(_KEY_COLUMNS), set_=updates)
+    db.execute(stmt, buckets)
+
+
+def _merge(db: Session, buckets: Dict[tuple, Dict[str, Any]]):
+    """Portable read-modify-write merge for dialects without upsert"""
+    for key, bucket in buckets.items():
+        existing = db.execute(
+            select(MetricRollup)
+            .filter_by(**dict(zip(_KEY_COLUMNS, key)))
+            .with_for_update()
+        ).scalar_one_or_none()
+
+        if existing is None:
+            db.add(MetricRollup(**bucket))
+            continue
+
+        existing.count += bucket["count"]
+        for field in ROLLUP_FIELDS:
+            for part in ("count", "sum"):
+                column = f"{field}_{part}"
+                setattr(existing, column, getattr(existing, column) + bucket[column])
+            for part, pick in (("min", min), ("max", max)):
+                column = f"{field}_{part}"
+                values = [v for v in (getattr(existing, column), bucket[column]) if v is not None]
+                setattr(existing, column, pick(values) if values else None)
@@ -3,21 +3,22 @@ Expense Tracker API Endpoints
 Integrates with n8n for email notifications
 """
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, List
 from datetime import datetime
 import httpx
 import os
 
-from backend.database.connection import get_db_session
+from backend.database.connection import get_async_db_session
 from backend.database.models import Expense, Budget
 from backend.agents.planner_agent import PlannerAgent
-from backend.rag.memory_store import MemoryStore
+from backend.rag.registry import get_memory_store
 
 router = APIRouter(prefix="/api", tags=["expenses"])
 
 # Initialize AI components
-memory_store = MemoryStore(use_pinecone=False)
+memory_store = get_memory_store()
 planner_agent = PlannerAgent(memory_store)
 
 # n8n Webhook URL (from environment)
@@ -27,7 +28,7 @@ N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL", "http://localhost:5678/webhook/ex
 @router.post("/expenses")
 async def create_expense(
     expense_data: Dict[str, Any],
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
     Create a new expense and check budget limits
@@ -61,22 +62,22 @@ async def create_expense(
             expense.ai_suggestion = "Smart categorization applied"
         
         db.add(expense)
-        db.commit()
-        db.refresh(expense)
+        await db.commit()
+        await db.refresh(expense)
         
         # Check budget for this category
-        budget = db.query(Budget).filter(Budget.category == expense.category).first()
+        budget = await db.scalar(select(Budget).where(Budget.category == expense.category))
         budget_exceeded = False
         
         if budget:
             # Calculate total spent in this category
-            total_spent = db.query(Expense).filter(
-                Expense.category == expense.category
-            ).with_entities(db.func.sum(Expense.amount)).scalar() or 0
+            total_spent = await db.scalar(
+                select(func.sum(Expense.amount)).where(Expense.category == expense.category)
+            ) or 0
             
             budget.spent = float(total_spent)
             budget.percentage = (budget.spent / budget.limit) * 100 if budget.limit > 0 else 0
-            db.commit()
+            await db.commit()
             
             # Check if budget exceeded
             if budget.percentage > 100:
@@ -105,21 +106,20 @@ async def create_expense(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/expenses")
 async def get_expenses(
     limit: int = 50,
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """Get all expenses"""
     try:
-        expenses = db.query(Expense)\
-            .order_by(Expense.date.desc())\
-            .limit(limit)\
-            .all()
+        expenses = (await db.execute(
+            select(Expense).order_by(Expense.date.desc()).limit(limit)
+        )).scalars().all()
         
         return {
             "expenses": [
@@ -141,40 +141,42 @@ async def get_expenses(
 @router.delete("/expenses/{expense_id}")
 async def delete_expense(
     expense_id: int,
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """Delete an expense"""
     try:
-        expense = db.query(Expense).filter(Expense.id == expense_id).first()
+        expense = await db.get(Expense, expense_id)
         if not expense:
             raise HTTPException(status_code=404, detail="Expense not found")
         
         category = expense.category
-        db.delete(expense)
-        db.commit()
+        await db.delete(expense)
+        await db.commit()
         
         # Recalculate budget
-        budget = db.query(Budget).filter(Budget.category == category).first()
+        budget = await db.scalar(select(Budget).where(Budget.category == category))
         if budget:
-            total_spent = db.query(Expense).filter(
-                Expense.category == category
-            ).with_entities(db.func.sum(Expense.amount)).scalar() or 0
+            total_spent = await db.scalar(
+                select(func.sum(Expense.amount)).where(Expense.category == category)
+            ) or 0
             
             budget.spent = float(total_spent)
             budget.percentage = (budget.spent / budget.limit) * 100 if budget.limit > 0 else 0
-            db.commit()
+            await db.commit()
         
         return {"success": True}
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/budgets")
-async def get_budgets(db: Session = Depends(get_db_session)):
+async def get_budgets(db: AsyncSession = Depends(get_async_db_session)):
     """Get all budget categories"""
     try:
-        budgets = db.query(Budget).all()
+        budgets = (await db.execute(select(Budget))).scalars().all()
         
         return {
             "budgets": [
@@ -194,13 +196,13 @@ async def get_budgets(db: Session = Depends(get_db_session)):
 @router.post("/budgets")
 async def create_budget(
     budget_data: Dict[str, Any],
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """Create or update budget for a category"""
     try:
-        budget = db.query(Budget).filter(
-            Budget.category == budget_data["category"]
-        ).first()
+        budget = await db.scalar(
+            select(Budget).where(Budget.category == budget_data["category"])
+        )
         
         if budget:
             budget.limit = budget_data["limit"]
@@ -213,8 +215,8 @@ async def create_budget(
             )
             db.add(budget)
         
-        db.commit()
-        db.refresh(budget)
+        await db.commit()
+        await db.refresh(budget)
         
         return {"success": True, "budget": {
             "category": budget.category,
@@ -223,7 +225,7 @@ async def create_budget(
             "percentage": budget.percentage
         }}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -0,0 +1 @@
+# Backend ingest package
@@ -0,0 +1,183 @@
+"""
+Write-behind buffer for metric ingestion
+Queues validated metric rows in-process and commits them in group transactions
+"""
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import time
+import uuid
+
+from backend.database.connection import get_db
+from backend.ingest.metrics import insert_metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class IngestBufferFull(Exception):
+    """Raised when the buffer stays full for longer than the enqueue timeout"""
+
+
+class MetricWriteBuffer:
+    """
+    Bounded in-process queue with a background group-commit flusher
+
+    Producers call submit() and return immediately; the flusher commits
+    queued rows once flush_batch_size rows are waiting or
+    flush_interval_s has passed since the first row of the group arrived.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 50000,
+        flush_batch_size: int = 1000,
+        flush_interval_s: float = 0.2,
+        enqueue_timeout_s: float = 1.0,
+        max_retries: int = 3
+    ):
+        self.max_size = max_size
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval_s = flush_interval_s
+        self.enqueue_timeout_s = enqueue_timeout_s
+        self.max_retries = max_retries
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.failed = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether submit() currently accepts rows"""
+        return self._accepting
+
+    async def start(self):
+        """Start the background flusher on the running event loop"""
+        if self._task is not None:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._accepting = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("Metric write buffer started")
+
+    async def stop(self):
+        """Stop accepting rows and flush everything still queued"""
+        if self._task is None:
+            return
+
+        self._accepting = False
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+        # Producers that were blocked on a full queue may have enqueued
+        # behind the stop marker; commit those too.
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                remaining.append(item)
+        if remaining:
+            await self._flush(remaining)
+
+        logger.info(f"Metric write buffer stopped ({self.flushed} rows flushed)")
+
+    async def submit(self, row: Dict[str, Any]) -> str:
+        """
+        Queue a validated metric row for a later group commit
+
+        Args:
+            row: Row produced by parse_metric
+
+        Returns:
+            Ingest ID assigned to the row
+        """
+        if not self._accepting:
+            raise RuntimeError("Metric write buffer is not running")
+
+        try:
+            await asyncio.wait_for(self._queue.put(row), timeout=self.enqueue_timeout_s)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise IngestBufferFull(
+                f"Ingest queue full ({self.max_size} metrics pending)"
+            )
+
+        self.accepted += 1
+        return uuid.uuid4().hex
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer statistics"""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "flushes": self.flushes
+        }
+
+    async def _run(self):
+        """Collect groups of rows and commit them until the stop marker arrives"""
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self):
+        """Wait for the first row, then gather more until the size or time bound"""
+        item = await self._queue.get()
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval_s
+
+        while len(batch) < self.flush_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    async def _flush(self, rows: List[Dict[str, Any]]):
+        """Commit one group of rows, retrying transient database failures"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(self._write, rows)
+                self.flushed += len(rows)
+                self.flushes += 1
+                return
+            except Exception as e:
+                logger.warning(
+                    f"Metric flush of {len(rows)} rows failed "
+                    f"(attempt {attempt + 1}/{self.max_retries + 1}): {e}"
+                )
+                if attempt < self.max_retries:
+                    await asyncio.sleep(min(2 ** attempt * 0.1, 5.0))
+
+        self.failed += len(rows)
+        logger.error(f"Dropped {len(rows)} metrics after {self.max_retries + 1} failed flushes")
+
+    @staticmethod
+    def _write(rows: List[Dict[str, Any]]):
+        with get_db() as db:
+            insert_metrics(db, rows)
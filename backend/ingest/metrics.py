@@ -0,0 +1,138 @@
+"""
+Metric ingestion helpers
+Validation and bulk persistence shared by the metrics ingest endpoints
+"""
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
+import logging
+import math
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.database.models import ModelMetrics
+from backend.database.rollups import update_rollups
+
+logger = logging.getLogger(__name__)
+
+# Numeric ModelMetrics columns accepted from producers
+FLOAT_FIELDS = (
+    "accuracy",
+    "precision",
+    "recall",
+    "f1_score",
+    "latency_ms",
+    "data_drift_score",
+)
+
+
+class MetricValidationError(ValueError):
+    """Raised when a metric payload does not match the ModelMetrics schema"""
+
+
+def parse_metric(payload: Any) -> Dict[str, Any]:
+    """
+    Validate a metric payload and convert it into a ModelMetrics row
+
+    Args:
+        payload: Metric data as sent to /api/metrics
+
+    Returns:
+        Column mapping ready for insertion
+    """
+    if not isinstance(payload, dict):
+        raise MetricValidationError("metric must be a JSON object")
+
+    row = {
+        "model_name": _parse_str(payload, "model_name", "unknown", 255),
+        "model_version": _parse_str(payload, "model_version", "1.0", 100),
+        "timestamp": _parse_timestamp(payload.get("timestamp")),
+        "concept_drift_detected": _parse_bool(payload, "concept_drift_detected"),
+        "meta_data": _parse_metadata(payload.get("metadata")),
+    }
+
+    for field in FLOAT_FIELDS:
+        row[field] = _parse_float(payload, field)
+
+    return row
+
+
+def insert_metrics(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Bulk insert validated metric rows
+
+    Rollup buckets are updated in the same statement batch. The caller
+    owns the transaction; nothing is committed here.
+
+    Args:
+        db: Database session
+        rows: Rows produced by parse_metric
+
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+
+    db.execute(insert(ModelMetrics), rows)
+    update_rollups(db, rows)
+    return len(rows)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to the naive UTC form stored in the database"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_str(payload: Dict[str, Any], field: str, default: str, max_length: int) -> str:
+    value = payload.get(field)
+    if value is None:
+        return default
+    if not isinstance(value, str) or not value:
+        raise MetricValidationError(f"{field} must be a non-empty string")
+    if len(value) > max_length:
+        raise MetricValidationError(f"{field} must be at most {max_length} characters")
+    return value
+
+
+def _parse_float(payload: Dict[str, Any], field: str) -> Optional[float]:
+    value = payload.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise MetricValidationError(f"{field} must be a number")
+    if not math.isfinite(value):
+        raise MetricValidationError(f"{field} must be finite")
+    return float(value)
+
+
+def _parse_bool(payload: Dict[str, Any], field: str) -> bool:
+    value = payload.get(field)
+    if value is None:
+        return False
+    if not isinstance(value, bool):
+        raise MetricValidationError(f"{field} must be a boolean")
+    return value
+
+
+def _parse_metadata(value: Any) -> Dict[str, Any]:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise MetricValidationError("metadata must be a JSON object")
+    return value
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """Parse an optional ISO-8601 timestamp into naive UTC (receive time if absent)"""
+    if value is None:
+        return datetime.utcnow()
+    if not isinstance(value, str):
+        raise MetricValidationError("timestamp must be an ISO-8601 string")
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise MetricValidationError("timestamp must be an ISO-8601 string")
+    return naive_utc(parsed)
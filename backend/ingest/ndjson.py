@@ -0,0 +1,75 @@
+"""
+Incremental NDJSON parsing
+Splits a streamed request body into JSON lines without buffering the whole body
+"""
+from typing import Any, AsyncIterator, Optional, Tuple
+import json
+
+
+async def iter_ndjson(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = 65536
+) -> AsyncIterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Parse newline-delimited JSON as the body arrives
+
+    Memory use is bounded by max_line_bytes: an over-long line is
+    discarded up to its terminating newline and reported as an error.
+
+    Args:
+        chunks: Raw body chunks (e.g. Request.stream())
+        max_line_bytes: Longest accepted line
+
+    Yields:
+        (line_number, payload, error) - payload is None when error is set
+    """
+    buffer = bytearray()
+    line_number = 0
+    skipping = False
+
+    async for chunk in chunks:
+        buffer.extend(chunk)
+
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+
+            line = bytes(buffer[:newline])
+            del buffer[:newline + 1]
+            line_number += 1
+
+            if skipping:
+                skipping = False
+                yield line_number, None, f"line exceeds {max_line_bytes} bytes"
+                continue
+
+            result = _parse_line(line, max_line_bytes)
+            if result is not None:
+                yield (line_number,) + result
+
+        if len(buffer) > max_line_bytes:
+            # Drop the partial line now rather than letting it grow.
+            buffer.clear()
+            skipping = True
+
+    if skipping:
+        yield line_number + 1, None, f"line exceeds {max_line_bytes} bytes"
+    elif buffer:
+        result = _parse_line(bytes(buffer), max_line_bytes)
+        if result is not None:
+            yield (line_number + 1,) + result
+
+
+def _parse_line(line: bytes, max_line_bytes: int) -> Optional[Tuple[Any, Optional[str]]]:
+    """Decode one line; blank lines are skipped (None)"""
+    line = line.strip()
+    if not line:
+        return None
+    if len(line) > max_line_bytes:
+        return None, f"line exceeds {max_line_bytes} bytes"
+
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, f"invalid JSON: {e}"
@@ -2,22 +2,35 @@
 AURORA FastAPI Backend
 Main API server for the AURORA system
 """
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional
+from types import SimpleNamespace
+import asyncio
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
 from backend.config import settings
-from backend.database.connection import get_db_session, init_db
+from backend.database.connection import get_async_db_session, init_db, async_engine, get_pool_stats
 from backend.database.models import ModelMetrics, AgentDecision as AgentDecisionModel, SystemState
 from backend.agents.planner_agent import PlannerAgent
 from backend.agents.critic_agent import CriticAgent
 from backend.agents.executor_agent import ExecutorAgent
 from backend.agents.base_agent import AgentDecisionType
-from backend.rag.memory_store import MemoryStore
+from backend.rag.encoder import encoder_loaded
+from backend.rag.registry import get_memory_store, warm_up
+from backend.rag.rehydration import Rehydrator, decision_doc_id
+from backend.database.rollups import query_rollups, update_rollups
+from backend.database.pagination import keyset_statement, keyset_page, decode_cursor, encode_cursor, MAX_PAGE_SIZE
+from backend.database.retention import run_retention, read_archive
+from backend.database.export import stream_metrics as stream_metrics_export, EXPORT_FORMATS
+from backend.ingest.metrics import parse_metric, insert_metrics, naive_utc, MetricValidationError
+from backend.ingest.buffer import MetricWriteBuffer, IngestBufferFull
+from backend.ingest.ndjson import iter_ndjson
 from backend.expense_api import router as expense_router
 from backend.aurora_monitor_api import router as aurora_monitor_router
 
@@ -46,10 +59,25 @@ app.add_middleware(
 )
 
 # Initialize components
-memory_store = MemoryStore(use_pinecone=False)  # Use FAISS for free tier
+memory_store = get_memory_store()
 planner_agent = PlannerAgent(memory_store)
 critic_agent = CriticAgent()
 executor_agent = ExecutorAgent()
+metric_buffer = MetricWriteBuffer(
+    max_size=settings.metrics_buffer_max_size,
+    flush_batch_size=settings.metrics_flush_batch_size,
+    flush_interval_s=settings.metrics_flush_interval_ms / 1000,
+    enqueue_timeout_s=settings.metrics_enqueue_timeout_ms / 1000,
+    max_retries=settings.max_retries
+)
+rehydrator = Rehydrator(
+    memory_store,
+    chunk_size=settings.memory_rehydrate_chunk_size,
+    enabled=settings.memory_rehydrate_on_startup
+)
+retention_task = None
+warmup_task = None
+rehydration_task = None
 
 # Include expense tracker API routes
 app.include_router(expense_router)
@@ -65,11 +93,101 @@ async def startup_event():
     init_db()
     logger.info("Database initialized")
     
-    # Store initial system knowledge
-    await memory_store.store(
-        "System initialization: AURORA started successfully",
-        {"type": "system", "event": "startup"}
+    if settings.metrics_ingest_mode == "buffered":
+        await metric_buffer.start()
+    
+    if settings.retention_enabled:
+        global retention_task
+        retention_task = asyncio.create_task(retention_loop())
+    
+    await memory_store.start()
+    
+    # Restore memories of past decisions / experiments in the background;
+    # /health reports progress meanwhile
+    if settings.memory_rehydrate_on_startup:
+        global rehydration_task
+        rehydration_task = asyncio.create_task(rehydrator.run())
+    
+    # Load the embedding model and store initial system knowledge without
+    # holding up startup
+    global warmup_task
+    warmup_task = asyncio.create_task(record_startup())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered state before the process exits"""
+    logger.info("Stopping AURORA API...")
+    await metric_buffer.stop()
+    
+    if retention_task is not None:
+        retention_task.cancel()
+    
+    for task in (warmup_task, rehydration_task):
+        if task is not None and not task.done():
+            task.cancel()
+    
+    await memory_store.stop()
+    await async_engine.dispose()
+
+
+async def record_startup():
+    """Warm up the encoder, then store initial system knowledge"""
+    if settings.embedding_warmup:
+        await warm_up()
+    
+    try:
+        await memory_store.store(
+            "System initialization: AURORA started successfully",
+            {"type": "system", "event": "startup"}
+        )
+    except Exception as e:
+        logger.error(f"Failed to store startup memory: {e}")
+
+
+async def retention_loop():
+    """Periodically move rows past their retention age into Parquet archives"""
+    while True:
+        try:
+            archived = await asyncio.to_thread(run_retention)
+            logger.info(f"Retention run complete: {archived}")
+        except Exception as e:
+            logger.error(f"Retention run failed: {e}")
+        await asyncio.sleep(settings.retention_interval_minutes * 60)
+
+
+async def fill_from_archive(
+    table: str,
+    rows: List[Any],
+    limit: int,
+    next_cursor: Optional[str],
+    before: Optional[str],
+    after: Optional[str],
+    filters: Optional[Dict[str, Any]] = None
+):
+    """
+    Continue a short newest-first page with archived rows
+    
+    Archived rows are all older than live ones, so once the live table is
+    exhausted the same (timestamp, id) keyset simply continues on disk.
+    """
+    if after or next_cursor is not None or len(rows) >= limit:
+        return rows, next_cursor
+    
+    if rows:
+        boundary = (rows[-1].timestamp, rows[-1].id)
+    else:
+        boundary = decode_cursor(before) if before else None
+    
+    remaining = limit - len(rows)
+    archived = await asyncio.to_thread(
+        read_archive, table, settings.archive_dir, remaining + 1, before=boundary, filters=filters
     )
+    rows = rows + [SimpleNamespace(**row) for row in archived[:remaining]]
+    
+    if len(archived) > remaining:
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows, next_cursor
 
 
 @app.get("/")
@@ -91,7 +209,9 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat(),
         "components": {
             "database": "operational",
-            "memory_store": "operational",
+            "memory_store": "rehydrating" if rehydrator.running else "operational",
+            "memory_rehydration": rehydrator.progress()["progress"],  # None when disabled
+            "embedding_model": "loaded" if encoder_loaded() else "loading",
             "agents": "operational"
         }
     }
@@ -100,7 +220,7 @@ async def health_check():
 @app.post("/api/analyze")
 async def analyze_system(
     context: Dict[str, Any],
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
     Analyze system state and get agent recommendations
@@ -144,13 +264,15 @@ async def analyze_system(
             outcome=execution_result.to_dict() if execution_result else None
         )
         db.add(decision_record)
-        db.commit()
+        await db.commit()
         
-        # Store in memory for future RAG
+        # Store in memory for future RAG (under the row's doc_id, so
+        # rehydration recognises it)
         await memory_store.store_decision(
             decision_type=critic_decision.decision_type.value,
             reasoning=critic_decision.reasoning,
-            outcome=execution_result.to_dict() if execution_result else {}
+            outcome=execution_result.to_dict() if execution_result else {},
+            doc_id=decision_doc_id(decision_record.id)
         )
         
         return {
@@ -168,24 +290,35 @@ async def analyze_system(
 @app.post("/api/metrics")
 async def log_metrics(
     metrics: Dict[str, Any],
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
-    """Log model metrics"""
+    """
+    Log model metrics
+    
+    In buffered ingest mode the point is queued for a group commit and
+    the endpoint answers 202 with an ingest id instead of the row id.
+    """
     try:
-        metric_record = ModelMetrics(
-            model_name=metrics.get("model_name", "unknown"),
-            model_version=metrics.get("model_version", "1.0"),
-            accuracy=metrics.get("accuracy"),
-            precision=metrics.get("precision"),
-            recall=metrics.get("recall"),
-            f1_score=metrics.get("f1_score"),
-            latency_ms=metrics.get("latency_ms"),
-            data_drift_score=metrics.get("data_drift_score"),
-            concept_drift_detected=metrics.get("concept_drift_detected", False),
-            meta_data=metrics.get("metadata", {})
+        row = parse_metric(metrics)
+    except MetricValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if metric_buffer.running:
+        try:
+            ingest_id = await metric_buffer.submit(row)
+        except IngestBufferFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        
+        return JSONResponse(
+            status_code=202,
+            content={"status": "accepted", "ingest_id": ingest_id}
         )
+    
+    try:
+        metric_record = ModelMetrics(**row)
         db.add(metric_record)
-        db.commit()
+        await db.run_sync(update_rollups, [row])
+        await db.commit()
         
         return {"status": "success", "id": metric_record.id}
         
@@ -194,20 +327,157 @@ async def log_metrics(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/metrics/batch")
+async def log_metrics_batch(
+    metrics: List[Any],
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Log many model metrics with one bulk insert
+    
+    Valid points are written in a single transaction; invalid points are
+    reported per item (by position in the request array) instead of
+    failing the whole batch.
+    """
+    if len(metrics) > settings.metrics_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.metrics_batch_max_size} metrics"
+        )
+    
+    rows = []
+    errors = []
+    for index, payload in enumerate(metrics):
+        try:
+            rows.append(parse_metric(payload))
+        except MetricValidationError as e:
+            errors.append({"index": index, "error": str(e)})
+    
+    try:
+        inserted = await db.run_sync(insert_metrics, rows)
+        await db.commit()
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to log metrics batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "status": "success" if not errors else "partial",
+        "inserted": inserted,
+        "rejected": len(errors),
+        "errors": errors
+    }
+
+
+@app.post("/api/metrics/stream")
+async def stream_metrics(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Ingest an NDJSON stream of metrics over one long-lived request
+    
+    Each line is one /api/metrics payload. Lines are parsed as the body
+    arrives and committed in chunks of metrics_stream_commit_size rows
+    (or every metrics_stream_commit_interval_ms), so memory stays
+    bounded however long the stream runs. Chunks committed before an
+    error or disconnect are kept.
+    """
+    rows = []
+    inserted = 0
+    rejected = 0
+    errors = []
+    commit_interval_s = settings.metrics_stream_commit_interval_ms / 1000
+    last_commit = time.monotonic()
+    
+    try:
+        async for line_number, payload, error in iter_ndjson(
+            request.stream(),
+            max_line_bytes=settings.metrics_stream_max_line_bytes
+        ):
+            if error is None:
+                try:
+                    rows.append(parse_metric(payload))
+                except MetricValidationError as e:
+                    error = str(e)
+            
+            if error is not None:
+                rejected += 1
+                if len(errors) < settings.metrics_stream_max_errors:
+                    errors.append({"line": line_number, "error": error})
+            
+            if rows and (
+                len(rows) >= settings.metrics_stream_commit_size
+                or time.monotonic() - last_commit >= commit_interval_s
+            ):
+                inserted += await db.run_sync(insert_metrics, rows)
+                await db.commit()
+                rows = []
+                last_commit = time.monotonic()
+        
+        inserted += await db.run_sync(insert_metrics, rows)
+        await db.commit()
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Metric stream failed after {inserted} rows: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Stream failed after {inserted} committed metrics: {e}"
+        )
+    
+    return {
+        "status": "success" if not rejected else "partial",
+        "inserted": inserted,
+        "rejected": rejected,
+        "errors": errors
+    }
+
+
+@app.get("/api/metrics/ingest/stats")
+async def get_ingest_stats():
+    """Get write-behind ingest buffer statistics"""
+    return {"mode": settings.metrics_ingest_mode, "buffer": metric_buffer.get_stats()}
+
+
 @app.get("/api/metrics/latest")
 async def get_latest_metrics(
     model_name: str = None,
-    limit: int = 10,
-    db: Session = Depends(get_db_session)
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    before: str = None,
+    after: str = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_db_session)
 ):
-    """Get latest metrics"""
+    """
+    Get latest metrics
+    
+    Pages are newest first. Pass next_cursor as `before` for older rows
+    or prev_cursor as `after` for newer ones. With include_archived,
+    paging continues into the Parquet archive once live rows run out.
+    """
     try:
-        query = db.query(ModelMetrics)
+        stmt = select(ModelMetrics)
         
         if model_name:
-            query = query.filter(ModelMetrics.model_name == model_name)
+            stmt = stmt.where(ModelMetrics.model_name == model_name)
+        
+        stmt = keyset_statement(
+            stmt, ModelMetrics.timestamp, ModelMetrics.id, limit, before=before, after=after
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    try:
+        rows = list((await db.execute(stmt)).scalars())
+        metrics, next_cursor, prev_cursor = keyset_page(rows, limit, before=before, after=after)
         
-        metrics = query.order_by(ModelMetrics.timestamp.desc()).limit(limit).all()
+        if include_archived:
+            metrics, next_cursor = await fill_from_archive(
+                ModelMetrics.__tablename__, metrics, limit, next_cursor, before, after,
+                filters={"model_name": model_name}
+            )
         
         return {
             "metrics": [
@@ -221,7 +491,9 @@ async def get_latest_metrics(
                     "data_drift_score": m.data_drift_score
                 }
                 for m in metrics
-            ]
+            ],
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
         }
         
     except Exception as e:
@@ -229,17 +501,117 @@ async def get_latest_metrics(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/metrics/export")
+async def export_metrics(
+    format: str = "arrow",
+    model_name: str = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """
+    Stream metric history as Arrow IPC (format=arrow) or Parquet
+    
+    Intended for offline analysis instead of /api/metrics/latest with
+    huge limits: rows are encoded batch by batch from a database cursor
+    and never collected into one response in memory.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=422, detail=f"format must be one of {list(EXPORT_FORMATS)}")
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_metrics_export(
+            format,
+            model_name=model_name,
+            start=naive_utc(start) if start else None,
+            end=naive_utc(end) if end else None,
+            chunk_size=settings.metrics_export_chunk_size
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="model_metrics.{extension}"'}
+    )
+
+
+@app.get("/api/metrics/rollups")
+async def get_metric_rollups(
+    model_name: str = None,
+    model_version: str = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = None,
+    min_points: int = None,
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Get downsampled metrics (count/mean/min/max per bucket)
+    
+    Without an explicit resolution (1m, 1h, 1d) the coarsest one that
+    still gives min_points buckets over [start, end) is used. The range
+    defaults to the last 24 hours.
+    """
+    end = naive_utc(end) if end else datetime.utcnow()
+    start = naive_utc(start) if start else end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=422, detail="start must be before end")
+    
+    try:
+        resolution, buckets = await db.run_sync(
+            query_rollups,
+            start,
+            end,
+            model_name=model_name,
+            model_version=model_version,
+            resolution=resolution,
+            min_points=min_points or settings.metrics_rollup_min_points
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to fetch metric rollups: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "resolution": resolution,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "buckets": buckets
+    }
+
+
 @app.get("/api/decisions")
 async def get_decisions(
-    limit: int = 20,
-    db: Session = Depends(get_db_session)
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    before: str = None,
+    after: str = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_db_session)
 ):
-    """Get recent agent decisions"""
+    """
+    Get recent agent decisions
+    
+    Supports the same before/after cursors and include_archived flag as
+    /api/metrics/latest.
+    """
+    try:
+        stmt = keyset_statement(
+            select(AgentDecisionModel),
+            AgentDecisionModel.timestamp,
+            AgentDecisionModel.id,
+            limit,
+            before=before,
+            after=after
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
     try:
-        decisions = db.query(AgentDecisionModel)\
-            .order_by(AgentDecisionModel.timestamp.desc())\
-            .limit(limit)\
-            .all()
+        rows = list((await db.execute(stmt)).scalars())
+        decisions, next_cursor, prev_cursor = keyset_page(rows, limit, before=before, after=after)
+        
+        if include_archived:
+            decisions, next_cursor = await fill_from_archive(
+                AgentDecisionModel.__tablename__, decisions, limit, next_cursor, before, after
+            )
         
         return {
             "decisions": [
@@ -254,7 +626,9 @@ async def get_decisions(
                     "executed": d.executed
                 }
                 for d in decisions
-            ]
+            ],
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
         }
         
     except Exception as e:
@@ -262,27 +636,91 @@ async def get_decisions(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/db/pool")
+async def get_db_pool_stats():
+    """Get database connection pool statistics"""
+    return get_pool_stats()
+
+
 @app.get("/api/memory/stats")
 async def get_memory_stats():
     """Get memory store statistics"""
     return memory_store.get_stats()
 
 
+@app.get("/api/memory/rehydration")
+async def get_memory_rehydration():
+    """Progress of restoring memories from agent_decisions / experiment_logs"""
+    return rehydrator.progress()
+
+
+@app.post("/api/memory/delete")
+async def delete_memory(body: Dict[str, Any]):
+    """Delete memories by document ID. Body: {"ids": [...]}"""
+    ids = body.get("ids") or []
+    if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+        raise HTTPException(status_code=422, detail="ids must be a list of strings")
+    
+    try:
+        return {"deleted": await memory_store.delete(ids)}
+    except Exception as e:
+        logger.error(f"Memory delete failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/memory/search")
 async def search_memory(query: Dict[str, Any]):
     """Search memory store"""
     try:
         results = await memory_store.search(
             query.get("query", ""),
-            top_k=query.get("top_k", 5)
+            top_k=query.get("top_k", 5),
+            filter_metadata=query.get("filter"),
+            mode=query.get("mode")
         )
         return {"results": results}
         
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Memory search failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/memory/search/batch")
+async def search_memory_batch(query: Dict[str, Any]):
+    """
+    Search memory store for several queries at once
+    
+    Body: {"queries": [...], "top_k": 5, "filter": {...}, "mode": "hybrid"}. The queries are
+    encoded in one batch and searched with one index call; results are
+    returned in query order.
+    """
+    queries = query.get("queries") or []
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        raise HTTPException(status_code=422, detail="queries must be a list of strings")
+    if len(queries) > settings.memory_search_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.memory_search_batch_max_size} queries"
+        )
+    
+    try:
+        results = await memory_store.search_many(
+            queries,
+            top_k=query.get("top_k", 5),
+            filter_metadata=query.get("filter"),
+            mode=query.get("mode")
+        )
+        return {"results": results}
+        
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch memory search failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
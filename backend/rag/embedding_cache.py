@@ -0,0 +1,84 @@
+"""
+Embedding Cache - Bounded LRU/TTL cache of text embeddings
+Repeated texts (planner queries, recurring decisions) skip the encoder
+"""
+from typing import Optional
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+
+def cache_key(text: str) -> str:
+    """Hash of the normalized text (case and whitespace insensitive)"""
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Least-recently-used embedding cache with a time-to-live
+
+    Entries older than ttl_s are treated as misses and dropped. Cached
+    arrays are shared, so callers must not modify them. Thread-safe.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl_s: float = 3600.0):
+        """
+        Args:
+            max_size: Maximum cached embeddings (0 disables the cache)
+            ttl_s: Entry lifetime in seconds (0 means no expiry)
+        """
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Cached embedding for text, or None"""
+        key = cache_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_s and time.monotonic() - entry[1] > self.ttl_s:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, text: str, embedding: np.ndarray):
+        """Cache an embedding, evicting the least recently used entry if full"""
+        if self.max_size <= 0:
+            return
+
+        key = cache_key(text)
+        with self._lock:
+            self._entries[key] = (embedding, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """Size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,121 @@
+"""
+Embedding Executor - Off-loop, micro-batched text encoding
+Runs encoder forward passes in a worker pool and merges concurrent requests
+"""
+from typing import Any, Callable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
+import numpy as np
+
+
+class EmbeddingExecutor:
+    """
+    Encodes texts in a thread pool, batching requests that arrive together
+
+    Requests made within batch_window_s of each other (up to max_batch_size
+    texts) are merged into a single encode() call, so throughput grows with
+    concurrency instead of paying one forward pass per request. The event
+    loop only queues work and awaits futures.
+    """
+
+    def __init__(
+        self,
+        get_encoder: Callable[[], Any],
+        max_batch_size: int = 64,
+        batch_window_s: float = 0.005,
+        max_workers: int = 1
+    ):
+        """
+        Args:
+            get_encoder: Returns an object with a SentenceTransformer-style
+                encode(); called in a worker thread the first time it is needed
+            max_batch_size: Largest batch passed to encode()
+            batch_window_s: How long to wait for more requests before encoding
+            max_workers: Encoder threads
+        """
+        self._get_encoder = get_encoder
+        self._encoder = None
+        self._encoder_lock = threading.Lock()
+        self.max_batch_size = max_batch_size
+        self.batch_window_s = batch_window_s
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embed")
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.requests = 0
+        self.batches = 0
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Encode one text; concurrent calls share a batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window_s, self._dispatch, loop)
+
+        return await future
+
+    async def encode_many(self, texts: List[str]) -> np.ndarray:
+        """Encode a list of texts in a single encode() call"""
+        if len(texts) == 1:
+            return (await self.encode(texts[0]))[np.newaxis]
+
+        self.requests += len(texts)
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._encode_batch, list(texts))
+
+    def get_stats(self) -> dict:
+        """Batching statistics"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        self._pool.shutdown(wait=False)
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop):
+        """Send everything pending (up to max_batch_size) to the worker pool"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            self.batches += 1
+
+            work = loop.run_in_executor(self._pool, self._encode_batch, [text for text, _ in batch])
+            work.add_done_callback(lambda done, batch=batch: self._resolve(batch, done))
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Runs in a worker thread"""
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    self._encoder = self._get_encoder()
+        batch_size = max(1, min(len(texts), self.max_batch_size))
+        return np.asarray(self._encoder.encode(texts, batch_size=batch_size), dtype=np.float32)
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[str, asyncio.Future]], done: asyncio.Future):
+        error = None if done.cancelled() else done.exception()
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if done.cancelled():
+                future.cancel()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[i])
@@ -0,0 +1,153 @@
+"""
+Embedding model loading
+One encoder per process, loaded on first use
+"""
+from typing import Any, List, Optional
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+ENCODER_BACKENDS = ("torch", "onnx")
+
+# Files of an exported ONNX encoder directory (see scripts/export_onnx_encoder.py)
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+ONNX_CONFIG_FILE = "encoder_config.json"
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder() -> Any:
+    """
+    Return the process-wide sentence encoder, loading it on first call
+
+    Loading takes seconds and several hundred MB, so it happens once,
+    lazily, and never at import time. Safe to call from worker threads.
+    """
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                _encoder = load_encoder(settings.embedding_backend)
+    return _encoder
+
+
+def load_encoder(backend: str) -> Any:
+    """Load a new encoder for backend ("torch" or "onnx")"""
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"Loading embedding model {settings.embedding_model_name}")
+        return SentenceTransformer(settings.embedding_model_name)
+    if backend == "onnx":
+        logger.info(f"Loading ONNX embedding model from {settings.embedding_onnx_dir}")
+        return OnnxEncoder(settings.embedding_onnx_dir, num_threads=settings.embedding_onnx_threads)
+    raise ValueError(f"embedding backend must be one of {list(ENCODER_BACKENDS)}")
+
+
+def encoder_identity(backend: Optional[str] = None) -> str:
+    """
+    Name of the encoder that backend would load, e.g. "torch:all-MiniLM-L6-v2"
+
+    Vectors from different identities must not share an index: the ONNX
+    export is quantized, and the model behind either backend can change.
+    """
+    backend = backend or settings.embedding_backend
+    if backend == "onnx":
+        try:
+            with open(os.path.join(settings.embedding_onnx_dir, ONNX_CONFIG_FILE)) as f:
+                config = json.load(f)
+        except OSError:
+            return f"onnx:{settings.embedding_onnx_dir}"
+        return f"onnx:{config.get('model_name')}:{'int8' if config.get('quantized') else 'fp32'}"
+    return f"{backend}:{settings.embedding_model_name}"
+
+
+def encoder_loaded() -> bool:
+    """Whether the encoder has been loaded yet"""
+    return _encoder is not None
+
+
+class OnnxEncoder:
+    """
+    Sentence encoder running an exported transformer with ONNX Runtime
+
+    Reproduces SentenceTransformer's mean pooling and normalization on
+    top of the model's token embeddings, so vectors are interchangeable
+    with the PyTorch backend (within quantization error). Needs only
+    onnxruntime and tokenizers, not torch.
+    """
+
+    def __init__(self, model_dir: str, num_threads: int = 0):
+        """
+        Args:
+            model_dir: Directory holding model.onnx, tokenizer.json and
+                encoder_config.json
+            num_threads: Intra-op threads (0 lets ONNX Runtime decide)
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE)) as f:
+            self.config = json.load(f)
+        self.max_seq_length = self.config.get("max_seq_length", 256)
+        self.normalize = self.config.get("normalize", True)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, ONNX_TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=self.config.get("pad_token_id", 0))
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, ONNX_MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, sentences: Any, batch_size: int = 32, **kwargs) -> np.ndarray:
+        """SentenceTransformer-compatible encode() of a text or list of texts"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.config.get("dimension", 0)), dtype=np.float32)
+
+        # Encode similar lengths together so batches carry little padding
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        batches = [
+            self._encode_batch([texts[i] for i in order[start:start + batch_size]])
+            for start in range(0, len(texts), batch_size)
+        ]
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.vstack(batches)
+
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        token_embeddings = self.session.run(
+            None, {name: value for name, value in inputs.items() if name in self.input_names}
+        )[0]
+
+        # Mean over real (unpadded) tokens
+        mask = inputs["attention_mask"][:, :, np.newaxis].astype(np.float32)
+        embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
@@ -2,14 +2,41 @@
 RAG Memory Store - Vector database for system memory
 Stores and retrieves past experiments, decisions, and system states
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
 import logging
-from sentence_transformers import SentenceTransformer
+import os
+import re
+import threading
+import uuid
+import faiss
 import numpy as np
 from datetime import datetime
 
+from backend.config import settings
+from backend.rag.embedding_cache import EmbeddingCache
+from backend.rag.embedding_executor import EmbeddingExecutor
+from backend.rag.encoder import encoder_identity, get_encoder as default_encoder
+from backend.rag.metadata_store import FILTER_FIELDS, MetadataStore
+from backend.rag.persistence import METRIC, IndexSnapshots
+from backend.rag.vector_index import (
+    QUANTIZED_TYPES,
+    SegmentedIndex,
+    build_index,
+    configure_search,
+    exact_search,
+    needs_training,
+    normalize,
+    removes_in_place,
+    stable_id
+)
+
 logger = logging.getLogger(__name__)
 
+SEARCH_MODES = ("hybrid", "vector", "keyword")
+
 
 class MemoryStore:
     """
@@ -17,29 +44,62 @@ class MemoryStore:
     Uses sentence transformers for embeddings and FAISS for similarity search
     """
     
-    def __init__(self, use_pinecone: bool = False):
+    def __init__(
+        self,
+        use_pinecone: bool = False,
+        get_encoder: Optional[Callable[[], Any]] = None,
+        persist_dir: Optional[str] = None,
+        encoder_id: Optional[str] = None
+    ):
         """
         Initialize memory store
         
         Args:
             use_pinecone: If True, use Pinecone; otherwise use FAISS (local)
+            get_encoder: Encoder factory (defaults to the shared, lazily loaded model)
+            persist_dir: Directory for FAISS snapshots and metadata; None keeps
+                everything in memory
+            encoder_id: Identity of the encoder get_encoder returns (defaults
+                to the configured backend's, see encoder_identity)
         """
         self.use_pinecone = use_pinecone
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
-        self.dimension = 384  # Dimension of all-MiniLM-L6-v2
+        self.persist_dir = persist_dir
+        self.snapshot_task = None
+        self.eviction_task = None
+        self.compaction_task = None
+        self.reembed_task = None
+        self.reembedding = False
+        self.encoder_id = encoder_id or encoder_identity()
+        self.dimension = settings.embedding_dimension
+        self.embedder = EmbeddingExecutor(
+            get_encoder or default_encoder,
+            max_batch_size=settings.embedding_max_batch_size,
+            batch_window_s=settings.embedding_batch_window_ms / 1000,
+            max_workers=settings.embedding_workers
+        )
+        # Index searches and writes run here, off the event loop; searches
+        # read immutable index views, so they scale with this pool
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.memory_search_workers or os.cpu_count() or 1,
+            thread_name_prefix="memory"
+        )
+        self.embedding_cache = EmbeddingCache(
+            max_size=settings.embedding_cache_size,
+            ttl_s=settings.embedding_cache_ttl_s
+        )
         
         if use_pinecone:
             self._init_pinecone()
         else:
             self._init_faiss()
         
-        self.memory_cache = []
+        self.deduplicated = 0
+        self.evicted = 0
     
     def _init_pinecone(self):
         """Initialize Pinecone vector database"""
         try:
             import pinecone
-            from backend.config import settings
             
             pinecone.init(
                 api_key=settings.pinecone_api_key,
@@ -55,6 +115,7 @@ class MemoryStore:
                 )
             
             self.index = pinecone.Index(settings.pinecone_index_name)
+            self.next_id = 0
             logger.info("Pinecone initialized successfully")
             
         except Exception as e:
@@ -63,21 +124,300 @@ class MemoryStore:
             self._init_faiss()
     
     def _init_faiss(self):
-        """Initialize FAISS vector database (local)"""
+        """
+        Initialize FAISS vector database (local)
+        
+        With a persist_dir the last snapshot is mapped from disk (constant
+        time) and only memories written after it are re-added, so restart
+        cost depends on the snapshot interval rather than corpus size.
+        If the stored embeddings came from a different encoder, the index
+        starts empty and start() re-embeds every memory (see reembed).
+        """
         try:
-            import faiss
+            self.index = SegmentedIndex(self.dimension)
+            self._snapshot_lock = threading.Lock()
+            # Index + metadata writes, and a snapshot's final swap, happen under this
+            self._write_lock = threading.Lock()
             
-            # Create FAISS index
-            self.index = faiss.IndexFlatL2(self.dimension)
-            self.id_to_metadata = {}
-            self.next_id = 0
+            if self.persist_dir:
+                self.snapshots = IndexSnapshots(self.persist_dir)
+                self.metadata_store = MetadataStore(os.path.join(self.persist_dir, "memory.db"))
+                self._check_encoder()
+                manifest = self.snapshots.manifest()
+                # Snapshots from before encoders were recorded match the metadata store
+                current = manifest and manifest.get("metric") == METRIC and (
+                    manifest.get("encoder", self.encoder_id) == self.encoder_id
+                )
+                if current and not self.reembedding:
+                    index_type = manifest["index_type"]
+                    last_seq = self.snapshots.last_seq()
+                    base = configure_search(self.snapshots.load(mmap=True), index_type)
+                    self.index.set_base(base, last_seq, index_type, masked=self._masked_after(last_seq))
+                elif manifest:
+                    logger.info("Memory snapshot predates cosine scoring or another encoder built it; rebuilding in the background")
+            else:
+                self.metadata_store = MetadataStore()
+                self.metadata_store.set_encoder(self.encoder_id)
+                self.snapshots = None
+            
+            if not self.reembedding:
+                for ids, vectors in self.metadata_store.iter_embeddings(after_seq=self.index.base_last_seq):
+                    self.index.add(ids, normalize(vectors))
             
-            logger.info("FAISS initialized successfully")
+            logger.info(f"FAISS initialized successfully ({self.index.ntotal} memories)")
             
         except Exception as e:
             logger.error(f"FAISS initialization failed: {e}")
             raise
     
+    def _check_encoder(self):
+        """Note whether the stored embeddings came from another encoder"""
+        stored = self.metadata_store.encoder()
+        if stored is None:
+            # Stores from before encoders were recorded are taken as current
+            self.metadata_store.set_encoder(self.encoder_id)
+        elif stored != self.encoder_id:
+            logger.warning(f"Memories were embedded with {stored}, not {self.encoder_id}; re-embedding")
+            self.reembedding = True
+    
+    async def start(self):
+        """Start periodic snapshots / index merges, eviction and any re-embedding (FAISS only)"""
+        if self.use_pinecone or self.snapshot_task is not None:
+            return
+        self.snapshot_task = asyncio.create_task(self._snapshot_loop())
+        if self.reembedding:
+            self.reembed_task = asyncio.create_task(self._reembed())
+        if retention_enabled():
+            self.eviction_task = asyncio.create_task(self._eviction_loop())
+    
+    async def stop(self):
+        """Stop background work and take a final snapshot"""
+        for task in (self.snapshot_task, self.eviction_task, self.compaction_task, self.reembed_task):
+            if task is not None:
+                task.cancel()
+        self.snapshot_task = None
+        self.eviction_task = None
+        self.compaction_task = None
+        self.reembed_task = None
+        
+        if not self.use_pinecone and self.snapshots is not None:
+            try:
+                await asyncio.to_thread(self.snapshot)
+            except Exception as e:
+                logger.error(f"Final memory snapshot failed: {e}")
+        
+        self.embedder.shutdown()
+        self._pool.shutdown(wait=False)
+    
+    async def _run(self, function: Callable, *args) -> Any:
+        """Run a blocking index / metadata call in the memory worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(function, *args))
+    
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(settings.memory_snapshot_interval_s)
+            try:
+                await asyncio.to_thread(self.snapshot)
+            except Exception as e:
+                logger.error(f"Memory snapshot failed: {e}")
+    
+    async def _eviction_loop(self):
+        while True:
+            await asyncio.sleep(settings.memory_eviction_interval_minutes * 60)
+            try:
+                await asyncio.to_thread(self.evict)
+            except Exception as e:
+                logger.error(f"Memory eviction failed: {e}")
+            self._compact_if_needed()
+    
+    def _compact_if_needed(self):
+        """
+        Start a snapshot early when too much of the base is deleted slots
+        
+        Deleted and superseded vectors stay in the base (masked) until a
+        snapshot rebuilds it; past memory_compaction_threshold they cost
+        more search time and memory than an early merge.
+        """
+        if self.use_pinecone or self.index.deleted_ratio <= settings.memory_compaction_threshold:
+            return
+        if self.compaction_task is not None and not self.compaction_task.done():
+            return
+        self.compaction_task = asyncio.create_task(self._compact())
+    
+    async def _reembed(self):
+        try:
+            await self.reembed()
+        except Exception as e:
+            logger.error(f"Memory re-embedding failed: {e}")
+    
+    async def reembed(self, chunk_size: int = 500) -> int:
+        """
+        Re-encode every memory with the current encoder
+        
+        Used when the stored embeddings came from another encoder (e.g.
+        embedding_backend changed), whose vectors must not be compared
+        with the current one's. Meanwhile the index holds only memories
+        re-embedded or written since startup, and snapshots wait; at the
+        end the store records the new encoder and a fresh base is built.
+        
+        Returns:
+            Number of memories re-embedded
+        """
+        total = 0
+        for ids, texts in self.metadata_store.iter_texts(chunk_size):
+            embeddings = await self._embed_many(texts)
+            total += await self._run(self._replace_embeddings, ids, texts, embeddings)
+        
+        self.metadata_store.set_encoder(self.encoder_id)
+        self.reembedding = False
+        await asyncio.to_thread(self.snapshot)
+        logger.info(f"Re-embedded {total} memories with {self.encoder_id}")
+        return total
+    
+    def _replace_embeddings(self, ids: List[int], texts: List[str], embeddings: np.ndarray) -> int:
+        with self._write_lock:
+            # Memories rewritten since their text was read already have a current embedding
+            replaced = self.metadata_store.replace_embeddings(ids, texts, embeddings)
+            if replaced:
+                position = {memory_id: i for i, memory_id in enumerate(ids)}
+                self.index.upsert(
+                    np.array(replaced, dtype=np.int64),
+                    embeddings[[position[memory_id] for memory_id in replaced]]
+                )
+        return len(replaced)
+    
+    async def _compact(self):
+        logger.info(f"Compacting memory index ({self.index.deleted_ratio:.0%} of base slots deleted)")
+        try:
+            await asyncio.to_thread(self.snapshot)
+        except Exception as e:
+            logger.error(f"Memory compaction failed: {e}")
+    
+    def evict(self) -> int:
+        """
+        Delete memories outside the retention policy of their type
+        
+        Runs in a worker thread. Evicted vectors leave search results
+        immediately and are dropped from the index at the next snapshot.
+        
+        Returns:
+            Number of memories evicted
+        """
+        expired = []
+        for memory_type in self.metadata_store.memory_types():
+            expired.extend(self.metadata_store.expired_ids(memory_type, **retention_policy(memory_type)))
+        if not expired:
+            return 0
+        
+        with self._write_lock:
+            self.index.remove(np.array(expired, dtype=np.int64))
+            evicted = self.metadata_store.delete_many(expired)
+        self.evicted += evicted
+        logger.info(f"Evicted {evicted} memories past their retention policy")
+        return evicted
+    
+    def target_index_type(self, count: int) -> str:
+        """Index type the base should have at this store size"""
+        index_type = settings.memory_index_type
+        if needs_training(index_type) and count < settings.memory_index_train_threshold:
+            return "flat"  # not enough vectors to train the quantizers yet
+        return index_type
+    
+    def snapshot(self) -> bool:
+        """
+        Merge memories written since the last snapshot into a new base
+        
+        Runs in a worker thread. Normally the current base is copied, the
+        vectors of deleted and rewritten memories are removed from the
+        copy and the new ones appended; when the configured index type
+        differs from the base (e.g. the store just passed the IVF training
+        threshold), or the base cannot remove vectors in place (HNSW, or an
+        older ID-mapped IVF snapshot) and something was deleted or rewritten, the base is rebuilt from the
+        metadata store instead. The result is persisted and mapped back in
+        when a persist_dir is set. Searches and stores continue against
+        the old base meanwhile.
+        
+        Returns:
+            True if a new base was installed
+        """
+        if self.reembedding:
+            return False  # the metadata store still holds the old encoder's vectors
+        with self._snapshot_lock:
+            # Every committed row is already in the index (writes add to the
+            # index first), so everything up to the last committed seq can move
+            last_seq = self.index.base_last_seq
+            upto = self.metadata_store.max_seq()
+            changed = self.metadata_store.changed_ids(after_seq=last_seq, upto_seq=upto)
+            tombstones = self.metadata_store.tombstones()
+            stale = np.intersect1d(np.union1d(changed, tombstones), self.index.base_ids)
+            index_type = self.target_index_type(self.metadata_store.count())
+            rebuild = index_type != (self.index.base_type or "flat") or (
+                len(stale) > 0 and not removes_in_place(self.index.base)
+            )
+            if not len(changed) and not len(tombstones) and not rebuild:
+                return False
+            
+            if rebuild:
+                logger.info(f"Building {index_type} memory index over {self.metadata_store.count()} memories")
+                index = self._build_base(index_type, upto)
+            elif self.index.base is None:
+                index = self.index.new_flat()
+            elif self.snapshots is not None:
+                index = configure_search(self.snapshots.load(mmap=False), index_type)
+            else:
+                index = faiss.clone_index(self.index.base)
+            
+            if not rebuild:
+                if len(stale):
+                    index.remove_ids(faiss.IDSelectorBatch(stale))
+                for ids, vectors in self.metadata_store.iter_embeddings(after_seq=last_seq, upto_seq=upto):
+                    index.add_with_ids(normalize(vectors), ids)
+            
+            if self.snapshots is not None:
+                self.snapshots.save(index, upto, index_type, self.encoder_id)
+                del index
+                index = configure_search(self.snapshots.load(mmap=True), index_type)
+            
+            # Writes that landed while the base was built stay in the delta
+            # and mask their (now stale) copies in the new base
+            with self._write_lock:
+                self.index.set_base(index, upto, index_type, merged=changed, masked=self._masked_after(upto))
+            self.metadata_store.clear_tombstones(tombstones)
+            return True
+    
+    def _masked_after(self, seq: int) -> np.ndarray:
+        """Ids whose vectors in a base covering writes up to seq are out of date"""
+        return np.union1d(self.metadata_store.tombstones(), self.metadata_store.changed_ids(after_seq=seq))
+    
+    def _build_base(self, index_type: str, upto: int) -> faiss.Index:
+        """Build a fresh index of index_type over every memory written up to seq upto"""
+        index = build_index(index_type, self.dimension)
+        if not index.is_trained:
+            sample_size = max(settings.memory_ivf_nlist * 64, 256 * 64)
+            index.train(normalize(self.metadata_store.sample_embeddings(sample_size, upto_seq=upto)))
+        
+        for ids, vectors in self.metadata_store.iter_embeddings(upto_seq=upto):
+            index.add_with_ids(normalize(vectors), ids)
+        return index
+    
+    async def _embed_many(self, texts: List[str]) -> np.ndarray:
+        """Unit-length embeddings for texts; cache misses are encoded in one call"""
+        embeddings = [self.embedding_cache.get(text) for text in texts]
+        missing = {}  # text -> positions, so repeated texts are encoded once
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(texts[i], []).append(i)
+        
+        if missing:
+            encoded = normalize(await self.embedder.encode_many(list(missing)))
+            for (text, positions), embedding in zip(missing.items(), encoded):
+                self.embedding_cache.put(text, embedding)
+                for i in positions:
+                    embeddings[i] = embedding
+        
+        return np.stack(embeddings) if embeddings else np.zeros((0, self.dimension), dtype=np.float32)
+    
     async def store(
         self, 
         text: str, 
@@ -90,52 +430,208 @@ class MemoryStore:
         Args:
             text: Text to embed and store
             metadata: Associated metadata
-            doc_id: Optional document ID
+            doc_id: Optional document ID; storing under an existing ID
+                replaces that memory
             
         Returns:
             Document ID
         """
-        try:
-            # Generate embedding
-            embedding = self.encoder.encode(text)
+        return (await self.store_many([text], [metadata], [doc_id]))[0]
+    
+    async def store_many(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        doc_ids: Optional[List[Optional[str]]] = None,
+        timestamps: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """
+        Store several memories with one batched encode and one index add
+        
+        Args:
+            texts: Texts to embed and store
+            metadatas: Metadata per text
+            doc_ids: Optional document ID per text (None entries are generated);
+                existing IDs are replaced (upsert)
+            timestamps: Optional ISO time per text when the memory records a
+                past event (recency and retention count from it; FAISS only)
             
-            # Generate ID if not provided
-            if doc_id is None:
-                doc_id = f"mem_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{self.next_id}"
-                self.next_id += 1
+        Returns:
+            Document ID per text (an existing memory's ID for near-duplicates)
+        """
+        if len(metadatas) != len(texts) or any(
+            values is not None and len(values) != len(texts) for values in (doc_ids, timestamps)
+        ):
+            raise ValueError("texts, metadatas, doc_ids and timestamps must have the same length")
+        if not texts:
+            return []
+        doc_ids = list(doc_ids) if doc_ids is not None else [None] * len(texts)
+        
+        try:
+            # Generate embeddings
+            embeddings = await self._embed_many(texts)
             
             # Store based on backend
             if self.use_pinecone:
-                self.index.upsert([(doc_id, embedding.tolist(), metadata)])
+                for i in range(len(texts)):
+                    if doc_ids[i] is None:
+                        doc_ids[i] = f"mem_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{self.next_id}"
+                    self.next_id += 1
+                self.index.upsert([
+                    (doc_id, embedding.tolist(), metadata)
+                    for doc_id, embedding, metadata in zip(doc_ids, embeddings, metadatas)
+                ])
+                added = list(range(len(texts)))
             else:
-                # FAISS storage
-                self.index.add(np.array([embedding]))
-                self.id_to_metadata[self.next_id - 1] = {
-                    "id": doc_id,
-                    "text": text,
-                    "metadata": metadata
-                }
+                doc_ids, added = await self._run(self._store_faiss, texts, metadatas, doc_ids, embeddings, timestamps)
+                self._compact_if_needed()
             
-            # Cache locally
-            self.memory_cache.append({
-                "id": doc_id,
-                "text": text,
-                "metadata": metadata,
-                "timestamp": datetime.utcnow()
-            })
-            
-            logger.info(f"Stored memory: {doc_id}")
-            return doc_id
+            if len(texts) == 1:
+                logger.info(f"Stored memory: {doc_ids[0]}")
+            else:
+                logger.info(f"Stored {len(added)} memories ({len(texts) - len(added)} merged as duplicates)")
+            return doc_ids
             
         except Exception as e:
             logger.error(f"Failed to store memory: {e}")
             raise
     
+    def _store_faiss(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        doc_ids: List[Optional[str]],
+        embeddings: np.ndarray,
+        timestamps: Optional[List[Optional[str]]] = None
+    ) -> tuple:
+        """
+        Upsert memories into the FAISS index and metadata store
+        
+        Each memory's index id is derived from its doc_id, so writing an
+        existing doc_id replaces that memory (the last text wins within a
+        batch). Near-duplicates (of stored memories, or of earlier texts
+        in the same batch) only bump the matching memory's occurrence
+        count; a new explicit doc_id merged this way is recorded as an
+        alias of that memory, so it counts as stored. Only a doc_id that
+        is already stored (an upsert) is always written, and an aliased
+        doc_id written again becomes a memory of its own.
+        
+        Returns:
+            (doc_ids, positions of the texts that were written)
+        """
+        # Duplicate check and insert are one step, or two concurrent stores
+        # of near-identical text could both miss each other and both be added
+        with self._write_lock:
+            threshold = settings.memory_dedup_threshold
+            explicit = [doc_id for doc_id in doc_ids if doc_id is not None]
+            # Memories stored before ids were derived from doc_ids keep their id
+            existing_ids = self.metadata_store.ids_for_doc_ids(explicit)
+            aliased = self.metadata_store.aliases(explicit)
+            mergeable = {
+                i for i, doc_id in enumerate(doc_ids)
+                if doc_id is None or (doc_id not in existing_ids and doc_id not in aliased)
+            }
+            duplicates = self._find_duplicates(embeddings, metadatas, sorted(mergeable))
+            
+            rows = {}  # memory id -> (row, timestamp)
+            added = []
+            extra_occurrences = {}
+            new_aliases = {}  # merged doc_id -> memory id
+            batch_indexes = {}  # memory type -> (flat index over this batch, [(memory id, doc id)])
+            for i, (text, metadata, embedding) in enumerate(zip(texts, metadatas, embeddings)):
+                if i in duplicates:
+                    existing = self.metadata_store.touch(duplicates[i])
+                    if existing is not None:
+                        if doc_ids[i] is not None:
+                            new_aliases[doc_ids[i]] = duplicates[i]
+                        doc_ids[i] = existing
+                        self.deduplicated += 1
+                        continue
+            
+                batch_index, batch_ids = batch_indexes.setdefault(
+                    metadata.get("type"), (self.index.new_flat(), [])
+                )
+                if i in mergeable and threshold > 0 and batch_index.ntotal:
+                    distances, positions = batch_index.search(embedding[np.newaxis], 1)
+                    memory_id, existing = batch_ids[positions[0][0]]
+                    if distances[0][0] >= threshold and existing != doc_ids[i]:
+                        if doc_ids[i] is not None:
+                            new_aliases[doc_ids[i]] = memory_id
+                        doc_ids[i] = existing
+                        extra_occurrences[memory_id] = extra_occurrences.get(memory_id, 0) + 1
+                        self.deduplicated += 1
+                        continue
+            
+                if doc_ids[i] is None:
+                    doc_ids[i] = f"mem_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:12]}"
+                memory_id = existing_ids.get(doc_ids[i])
+                if memory_id is None:
+                    memory_id = stable_id(doc_ids[i])
+                rows[memory_id] = (
+                    (memory_id, doc_ids[i], text, metadata, embedding),
+                    timestamps[i] if timestamps else None
+                )
+                added.append(i)
+                batch_index.add_with_ids(embedding[np.newaxis], np.array([len(batch_ids)], dtype=np.int64))
+                batch_ids.append((memory_id, doc_ids[i]))
+            
+            if rows:
+                # FAISS storage: the metadata rows double as the append log
+                self.index.upsert(
+                    np.array(list(rows), dtype=np.int64),
+                    np.stack([row[4] for row, _ in rows.values()])
+                )
+                self.metadata_store.upsert_many(
+                    [row for row, _ in rows.values()],
+                    [timestamp for _, timestamp in rows.values()]
+                )
+            for memory_id, count in extra_occurrences.items():
+                self.metadata_store.touch(memory_id, count)
+            if new_aliases:
+                self.metadata_store.add_aliases(new_aliases)
+            if aliased:
+                self.metadata_store.remove_aliases(list(aliased))
+            
+            return doc_ids, added
+    
+    async def delete(self, ids: List[str]) -> int:
+        """
+        Delete memories
+        
+        Args:
+            ids: Document IDs, as returned by store() and search()
+            
+        Returns:
+            Number of memories deleted (unknown IDs are ignored; IDs merged
+            into another memory as near-duplicates only lose that link)
+        """
+        if not ids:
+            return 0
+        if self.use_pinecone:
+            self.index.delete(ids=list(ids))
+            return len(ids)
+        
+        deleted = await self._run(self._delete_faiss, list(ids))
+        if deleted:
+            logger.info(f"Deleted {deleted} memories")
+            self._compact_if_needed()
+        return deleted
+    
+    def _delete_faiss(self, doc_ids: List[str]) -> int:
+        memory_ids = list(self.metadata_store.ids_for_doc_ids(doc_ids).values())
+        with self._write_lock:
+            self.metadata_store.remove_aliases(doc_ids)
+            if not memory_ids:
+                return 0
+            self.index.remove(np.array(memory_ids, dtype=np.int64))
+            return self.metadata_store.delete_many(memory_ids)
+    
     async def search(
         self, 
         query: str, 
         top_k: int = 5,
-        filter_metadata: Optional[Dict[str, Any]] = None
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for similar memories
@@ -143,101 +639,380 @@ class MemoryStore:
         Args:
             query: Search query
             top_k: Number of results to return
-            filter_metadata: Optional metadata filters
+            filter_metadata: Optional metadata filters (field -> value, or list
+                of accepted values); type, decision_type, experiment_type and
+                model_name are applied before ranking
+            mode: hybrid | vector | keyword (see search_many)
             
         Returns:
             List of similar memories with scores
         """
-        try:
-            # Generate query embedding
-            query_embedding = self.encoder.encode(query)
+        return (await self.search_many([query], top_k, filter_metadata, mode))[0]
+    
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries with one batched encode and one index search
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results per query
+            filter_metadata: Optional metadata filters applied to every query
+            mode: "hybrid" (vector + BM25 keyword results fused by reciprocal
+                rank), "vector" or "keyword" (no encoding at all); defaults
+                to settings.memory_search_mode
+            
+        score is the cosine similarity (vector hits only), the BM25 score
+        (keyword hits only) or, when both found matches, a reciprocal rank
+        fusion value (~1/(memory_rrf_k + rank)) - compare thresholds
+        against vector_score, the raw cosine similarity, instead. Scores
+        are scaled down for memories not seen recently (see
+        memory_recency_weight); vector_score and keyword_score stay raw.
+        
+        Returns:
+            One result list per query, in order
             
+        Raises:
+            ValueError: Unknown mode
+            Exception: Encoder, index or metadata store failures
+        """
+        if not queries:
+            return []
+        mode = mode or settings.memory_search_mode
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of {list(SEARCH_MODES)}")
+        
+        try:
             if self.use_pinecone:
-                # Pinecone search
-                results = self.index.query(
-                    query_embedding.tolist(),
-                    top_k=top_k,
-                    include_metadata=True,
-                    filter=filter_metadata
-                )
-                
-                return [
-                    {
-                        "id": match.id,
-                        "score": match.score,
-                        "metadata": match.metadata
-                    }
-                    for match in results.matches
-                ]
+                return await self._search_pinecone(queries, top_k, filter_metadata)
             
-            else:
-                # FAISS search
-                distances, indices = self.index.search(
-                    np.array([query_embedding]), 
-                    min(top_k, len(self.id_to_metadata))
-                )
-                
-                results = []
-                for idx, distance in zip(indices[0], distances[0]):
-                    if idx in self.id_to_metadata:
-                        memory = self.id_to_metadata[idx]
-                        results.append({
-                            "id": memory["id"],
-                            "text": memory["text"],
-                            "score": float(1 / (1 + distance)),  # Convert distance to similarity
-                            "metadata": memory["metadata"]
-                        })
-                
-                return results
+            # FAISS + BM25 search
+            prefilter = {k: v for k, v in (filter_metadata or {}).items() if k in FILTER_FIELDS}
+            postfilter = {k: v for k, v in (filter_metadata or {}).items() if k not in FILTER_FIELDS}
+            # Post-filtering and recency re-ranking both need spare candidates
+            recency = settings.memory_recency_weight > 0
+            fetch_k = top_k * settings.memory_filter_overfetch if postfilter or recency else top_k
+            
+            keyword_hits = [None] * len(queries)
+            if mode != "vector" and self.metadata_store.keyword_search_enabled:
+                keyword_hits = await self._run(self._keyword_search, queries, fetch_k, prefilter)
+            
+            # Exact-term queries that the keyword index answers skip the encoder
+            needs_vector = [
+                i for i, query in enumerate(queries)
+                if mode == "vector"
+                or (mode == "hybrid" and not (_is_exact_term(query) and len(keyword_hits[i][0])))
+            ]
+            vector_hits = [None] * len(queries)
+            if needs_vector:
+                query_embeddings = await self._embed_many([queries[i] for i in needs_vector])
+                distances, indices = await self._run(self._faiss_search, query_embeddings, fetch_k, prefilter)
+                for i, row_indices, row_distances in zip(needs_vector, indices, distances):
+                    found = row_indices >= 0
+                    vector_hits[i] = (row_indices[found], row_distances[found])
+            
+            rankings = [_rank(vector_hits[i], keyword_hits[i]) for i in range(len(queries))]
+            return await self._run(self._results, rankings, top_k, postfilter, recency)
             
         except Exception as e:
+            # Not "no results": encoder or index failures reach the caller
             logger.error(f"Search failed: {e}")
-            return []
+            raise
+    
+    def _keyword_search(self, queries: List[str], k: int, filters: Dict[str, Any]) -> List[tuple]:
+        """BM25 (ids, scores) per query"""
+        return [self.metadata_store.keyword_search(query, k, filters) for query in queries]
+    
+    def _results(
+        self,
+        rankings: List[List[tuple]],
+        top_k: int,
+        postfilter: Dict[str, Any],
+        recency: bool
+    ) -> List[List[Dict[str, Any]]]:
+        """Result dicts per ranking: post-filtered, recency-weighted, top_k"""
+        memories = self.metadata_store.get_many(
+            sorted({memory_id for ranking in rankings for memory_id, _, _, _ in ranking})
+        )
+        
+        now = datetime.utcnow()
+        results = []
+        for ranking in rankings:
+            matches = []
+            for memory_id, score, vector_score, keyword_score in ranking:
+                memory = memories.get(memory_id)
+                if memory is None or not _matches(memory["metadata"], postfilter):
+                    continue
+                matches.append({
+                    "id": memory["id"],
+                    "text": memory["text"],
+                    "score": score * _recency(memory["last_seen"], now) if recency else score,
+                    "vector_score": vector_score,  # cosine similarity
+                    "keyword_score": keyword_score,  # BM25
+                    "metadata": memory["metadata"],
+                    "occurrences": memory["occurrences"],
+                    "last_seen": memory["last_seen"]
+                })
+            if recency:
+                matches.sort(key=lambda match: match["score"], reverse=True)
+            results.append(matches[:top_k])
+        return results
+    
+    async def _search_pinecone(
+        self,
+        queries: List[str],
+        top_k: int,
+        filter_metadata: Optional[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Vector search against Pinecone, one query call per query"""
+        query_embeddings = await self._embed_many(queries)
+        results = []
+        for query_embedding in query_embeddings:
+            response = self.index.query(
+                query_embedding.tolist(),
+                top_k=top_k,
+                include_metadata=True,
+                filter=filter_metadata
+            )
+            results.append([
+                {
+                    "id": match.id,
+                    "score": match.score,
+                    "metadata": match.metadata
+                }
+                for match in response.matches
+            ])
+        return results
+    
+    def _find_duplicates(
+        self,
+        embeddings: np.ndarray,
+        metadatas: List[Dict[str, Any]],
+        positions: List[int]
+    ) -> Dict[int, int]:
+        """
+        Stored memories within the dedup threshold of the embeddings at positions
+        
+        Only memories of the same type count; positions are grouped by type
+        so each type costs one (filtered) index search.
+        
+        Returns:
+            position -> matching memory id
+        """
+        threshold = settings.memory_dedup_threshold
+        if threshold <= 0 or self.index.ntotal == 0 or not positions:
+            return {}
+        
+        by_type = {}
+        for i in positions:
+            by_type.setdefault(metadatas[i].get("type"), []).append(i)
+        
+        duplicates = {}
+        for memory_type, group in by_type.items():
+            filters = {"type": memory_type} if memory_type is not None else {}
+            distances, ids = self._faiss_search(embeddings[group], 1, filters)
+            for i, distance, memory_id in zip(group, distances[:, 0], ids[:, 0]):
+                if memory_id >= 0 and distance >= threshold:
+                    duplicates[i] = int(memory_id)
+        return duplicates
+    
+    def _faiss_search(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        filters: Dict[str, Any]
+    ) -> tuple:
+        """
+        Top-k (distances, ids) per query row, restricted to memories matching filters
+        
+        Small match sets are scored exactly over just their vectors; larger
+        ones are searched through the index with an id selector, so
+        non-matching vectors are never ranked. With a quantized base,
+        memory_rerank_factor times more candidates are fetched and
+        re-scored against the stored full-precision embeddings.
+        """
+        ids = None
+        if filters:
+            candidates = self.metadata_store.filtered_embeddings(filters, limit=settings.memory_filter_exact_max)
+            if candidates is not None:
+                return exact_search(query_embeddings, candidates[0], candidates[1], k)
+            ids = self.metadata_store.filtered_ids(filters)
+        
+        factor = settings.memory_rerank_factor
+        if self.index.base_type not in QUANTIZED_TYPES or factor <= 1:
+            return self.index.search(query_embeddings, k, ids=ids)
+        
+        _, found = self.index.search(query_embeddings, k * factor, ids=ids)
+        candidate_ids, vectors = self.metadata_store.get_embeddings(np.unique(found[found >= 0]).tolist())
+        distances = np.full((len(query_embeddings), k), -np.inf, dtype=np.float32)
+        result_ids = np.full((len(query_embeddings), k), -1, dtype=np.int64)
+        for row, query_embedding in enumerate(query_embeddings):
+            keep = np.isin(candidate_ids, found[row])
+            distances[row], result_ids[row] = exact_search(query_embedding, candidate_ids[keep], vectors[keep], k)
+        return distances, result_ids
     
     async def store_experiment(
         self,
         experiment_type: str,
         description: str,
         results: Dict[str, Any],
-        success: bool
+        success: bool,
+        doc_id: Optional[str] = None
     ) -> str:
         """Store an experiment result for future retrieval"""
-        
-        text = f"{experiment_type}: {description}. Results: {results.get('summary', '')}"
-        
-        metadata = {
-            "type": "experiment",
-            "experiment_type": experiment_type,
-            "success": success,
-            "results": results,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        return await self.store(text, metadata)
+        text, metadata = experiment_memory(experiment_type, description, results, success)
+        return await self.store(text, metadata, doc_id)
     
     async def store_decision(
         self,
         decision_type: str,
         reasoning: str,
-        outcome: Dict[str, Any]
+        outcome: Dict[str, Any],
+        doc_id: Optional[str] = None
     ) -> str:
         """Store an agent decision for future learning"""
-        
-        text = f"Decision: {decision_type}. Reasoning: {reasoning}"
-        
-        metadata = {
-            "type": "decision",
-            "decision_type": decision_type,
-            "outcome": outcome,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        return await self.store(text, metadata)
+        text, metadata = decision_memory(decision_type, reasoning, outcome)
+        return await self.store(text, metadata, doc_id)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get memory store statistics"""
         return {
             "backend": "pinecone" if self.use_pinecone else "faiss",
-            "total_memories": len(self.memory_cache),
-            "dimension": self.dimension
+            "total_memories": self.next_id if self.use_pinecone else self.index.ntotal,
+            "dimension": self.dimension,
+            "index_type": None if self.use_pinecone else (self.index.base_type or "flat"),
+            "encoder": self.encoder_id,
+            "reembedding": self.reembedding,
+            "deduplicated": self.deduplicated,
+            "evicted": self.evicted,
+            "deleted_slot_ratio": None if self.use_pinecone else self.index.deleted_ratio,
+            "embedding": self.embedder.get_stats(),
+            "embedding_cache": self.embedding_cache.get_stats()
         }
+
+
+def experiment_memory(
+    experiment_type: str,
+    description: str,
+    results: Dict[str, Any],
+    success: bool,
+    timestamp: Optional[datetime] = None
+) -> tuple:
+    """(text, metadata) of the memory recording an experiment"""
+    text = f"{experiment_type}: {description}. Results: {results.get('summary', '')}"
+    
+    metadata = {
+        "type": "experiment",
+        "experiment_type": experiment_type,
+        "success": success,
+        "results": results,
+        "timestamp": (timestamp or datetime.utcnow()).isoformat()
+    }
+    return text, metadata
+
+
+def decision_memory(
+    decision_type: str,
+    reasoning: str,
+    outcome: Dict[str, Any],
+    timestamp: Optional[datetime] = None
+) -> tuple:
+    """(text, metadata) of the memory recording an agent decision"""
+    text = f"Decision: {decision_type}. Reasoning: {reasoning}"
+    
+    metadata = {
+        "type": "decision",
+        "decision_type": decision_type,
+        "outcome": outcome,
+        "timestamp": (timestamp or datetime.utcnow()).isoformat()
+    }
+    return text, metadata
+
+
+def retention_enabled() -> bool:
+    """Whether any memory type has a maximum age or count"""
+    policies = [retention_policy(None)] + [retention_policy(t) for t in settings.memory_retention_policies]
+    return any(value > 0 for policy in policies for value in policy.values())
+
+
+def retention_policy(memory_type: Optional[str]) -> Dict[str, int]:
+    """max_age_days / max_count for a memory type (per-type overrides of the global limits)"""
+    policy = {"max_age_days": settings.memory_max_age_days, "max_count": settings.memory_max_count}
+    overrides = settings.memory_retention_policies.get(memory_type, {}) if memory_type is not None else {}
+    policy.update({key: int(value) for key, value in overrides.items() if key in policy})
+    return policy
+
+
+def _recency(last_seen: Optional[str], now: datetime) -> float:
+    """
+    Score multiplier for a memory last seen at last_seen
+    
+    (1 - w) + w * 0.5 ** (age / half-life): with weight w only that share
+    of a score decays, so relevance still dominates.
+    """
+    weight = settings.memory_recency_weight
+    if not last_seen:
+        return 1.0 - weight
+    age_hours = max((now - datetime.fromisoformat(last_seen)).total_seconds() / 3600, 0.0)
+    return (1.0 - weight) + weight * 0.5 ** (age_hours / settings.memory_recency_half_life_hours)
+
+
+def _matches(metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Equality match of metadata against filters (list values mean any of)"""
+    for key, expected in filters.items():
+        value = metadata.get(key)
+        if isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def _is_exact_term(query: str) -> bool:
+    """Single identifier-like token (job id, model name, error code)"""
+    query = query.strip()
+    return bool(query) and not any(c.isspace() for c in query) and bool(re.search(r"[\d_\-.:/]", query))
+
+
+def _rank(vector_hits: Optional[tuple], keyword_hits: Optional[tuple]) -> List[tuple]:
+    """
+    Combine vector and keyword result lists into one ranking
+    
+    With two non-empty lists, results are ordered by reciprocal rank
+    fusion, sum(1 / (memory_rrf_k + rank)), which needs no score
+    calibration between cosine and BM25; the fused score is then only
+    meaningful as an ordering. With one non-empty list (e.g. no keyword
+    matches) its own scores are kept, so the score stays a similarity.
+    
+    Returns:
+        [(memory id, score, vector score, keyword score)], best first
+    """
+    lists = {
+        name: {int(i): float(score) for i, score in zip(*hits)}
+        for name, hits in (("vector", vector_hits), ("keyword", keyword_hits))
+        if hits is not None and len(hits[0])
+    }
+    if not lists:
+        return []
+    if len(lists) == 1:
+        name, scores = next(iter(lists.items()))
+        return [
+            (i, score, score if name == "vector" else None, score if name == "keyword" else None)
+            for i, score in scores.items()
+        ]
+    
+    fused = {}
+    for scores in lists.values():
+        for rank, i in enumerate(scores):
+            fused[i] = fused.get(i, 0.0) + 1.0 / (settings.memory_rrf_k + rank + 1)
+    
+    return [
+        (i, score, lists["vector"].get(i), lists["keyword"].get(i))
+        for i, score in sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    ]
@@ -0,0 +1,576 @@
+"""
+Memory Metadata Store - Compact on-disk record of every stored memory
+SQLite table holding text, metadata and the raw embedding of each FAISS id
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import json
+import logging
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Metadata fields copied into indexed columns so searches can be pre-filtered
+FILTER_FIELDS = ("type", "decision_type", "experiment_type", "model_name")
+
+
+class MetadataStore:
+    """
+    SQLite-backed memory records keyed by FAISS id
+
+    Embeddings are kept alongside the metadata so the vector index can be
+    rebuilt or caught up from here: every insert or update takes the next
+    write sequence number (seq), so rows with a seq after the last index
+    snapshot act as the append log. Text is also indexed in an FTS5
+    table for BM25 keyword search. Use ":memory:" for a non-persistent
+    store. Thread-safe: writes share one connection, while the reads on
+    the search path use a connection per thread so that, with WAL, they
+    run concurrently with each other and with writes.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS memories (
+                    id INTEGER PRIMARY KEY,
+                    doc_id TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            # Evicted ids that may still be in the last index snapshot
+            self._conn.execute("CREATE TABLE IF NOT EXISTS memory_tombstones (id INTEGER PRIMARY KEY)")
+            # doc_ids that were merged into another memory as near-duplicates
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory_aliases (doc_id TEXT PRIMARY KEY, id INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_memory_aliases_id ON memory_aliases (id)")
+            # Store-wide facts, e.g. which encoder produced the embeddings
+            self._conn.execute("CREATE TABLE IF NOT EXISTS memory_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._add_missing_columns()
+            self.keyword_search_enabled = self._create_keyword_index()
+            self._conn.commit()
+            self._seq = self._conn.execute("SELECT COALESCE(MAX(seq), -1) FROM memories").fetchone()[0]
+
+    def _add_missing_columns(self):
+        """Add and backfill columns that older stores lack"""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(memories)")}
+
+        # Near-duplicate writes bump these instead of adding a memory
+        if "occurrences" not in existing:
+            self._conn.execute("ALTER TABLE memories ADD COLUMN occurrences INTEGER NOT NULL DEFAULT 1")
+        if "updated_at" not in existing:
+            self._conn.execute("ALTER TABLE memories ADD COLUMN updated_at TEXT")
+            self._conn.execute("UPDATE memories SET updated_at = created_at")
+        if "seq" not in existing:
+            # Ids used to be assigned in write order
+            self._conn.execute("ALTER TABLE memories ADD COLUMN seq INTEGER")
+            self._conn.execute("UPDATE memories SET seq = id")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_memories_seq ON memories (seq)")
+
+        # An indexed column per filter field
+        for field in FILTER_FIELDS:
+            if field not in existing:
+                self._conn.execute(f"ALTER TABLE memories ADD COLUMN {field} TEXT")
+                self._conn.execute(f"UPDATE memories SET {field} = json_extract(metadata, '$.{field}')")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_memories_{field} ON memories ({field})")
+
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_memories_doc_id ON memories (doc_id)")
+
+    def _create_keyword_index(self) -> bool:
+        """Create (and for older stores, build) the BM25 full-text index over text"""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories_fts'"
+        ).fetchone()
+        if exists:
+            return True
+
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE memories_fts USING fts5(text, content='memories', content_rowid='id')"
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, keyword memory search disabled: {e}")
+            return False
+
+        self._conn.execute("INSERT INTO memories_fts (memories_fts) VALUES ('rebuild')")
+        return True
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """Connection for a read-only query (the shared one, locked, for in-memory stores)"""
+        if self.path == ":memory:":
+            with self._lock:
+                yield self._conn
+            return
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        yield conn
+
+    def upsert_many(
+        self,
+        rows: List[Tuple[int, str, str, Dict[str, Any], np.ndarray]],
+        timestamps: Optional[List[Optional[str]]] = None
+    ):
+        """
+        Insert or replace memories given as (id, doc_id, text, metadata, embedding), in one transaction
+
+        Replacing a memory keeps its created_at and occurrence count.
+
+        Args:
+            timestamps: Optional ISO time per row (None entries and the
+                default mean now), for memories of past events
+        """
+        now = datetime.utcnow().isoformat()
+        timestamps = [timestamp or now for timestamp in (timestamps or [None] * len(rows))]
+        columns = ("id", "doc_id", "text", "metadata", "embedding", "created_at", "updated_at", "seq") + FILTER_FIELDS
+        replaced = ("doc_id", "text", "metadata", "embedding", "updated_at", "seq") + FILTER_FIELDS
+        ids = [int(row[0]) for row in rows]
+        placeholders = ",".join("?" * len(ids))
+
+        with self._lock:
+            values = [
+                (
+                    memory_id,
+                    doc_id,
+                    text,
+                    json.dumps(metadata, default=str),
+                    np.asarray(embedding, dtype=np.float32).tobytes(),
+                    timestamp,
+                    timestamp,
+                    self._seq + 1 + i
+                ) + tuple(_filter_value(metadata.get(field)) for field in FILTER_FIELDS)
+                for i, ((memory_id, doc_id, text, metadata, embedding), timestamp) in enumerate(zip(rows, timestamps))
+            ]
+            if self.keyword_search_enabled:
+                # Replaced rows' old text has to leave the external-content FTS index first
+                self._conn.execute(
+                    "INSERT INTO memories_fts (memories_fts, rowid, text) "
+                    f"SELECT 'delete', id, text FROM memories WHERE id IN ({placeholders})",
+                    ids
+                )
+            self._conn.executemany(
+                f"INSERT INTO memories ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in replaced)}",
+                values
+            )
+            if self.keyword_search_enabled:
+                self._conn.executemany(
+                    "INSERT INTO memories_fts (rowid, text) VALUES (?, ?)",
+                    [(row[0], row[2]) for row in rows]
+                )
+            self._conn.commit()
+            self._seq += len(rows)
+
+    def replace_embeddings(self, ids: List[int], texts: List[str], embeddings: np.ndarray) -> List[int]:
+        """
+        Swap in new embeddings of unchanged memories, in one transaction
+
+        A memory only gets the new embedding if its text is still the text
+        it was computed from; each one takes a new seq (for the next
+        snapshot) but keeps its timestamps and occurrence count.
+
+        Returns:
+            Ids whose embedding was replaced
+        """
+        replaced = []
+        with self._lock:
+            for memory_id, text, embedding in zip(ids, texts, embeddings):
+                cursor = self._conn.execute(
+                    "UPDATE memories SET embedding = ?, seq = ? WHERE id = ? AND text = ?",
+                    (np.asarray(embedding, dtype=np.float32).tobytes(), self._seq + 1, int(memory_id), text)
+                )
+                if cursor.rowcount:
+                    self._seq += 1
+                    replaced.append(int(memory_id))
+            self._conn.commit()
+        return replaced
+
+    def touch(self, memory_id: int, count: int = 1) -> Optional[str]:
+        """
+        Record more occurrences of an existing memory
+
+        Returns:
+            The memory's doc_id, or None if it no longer exists
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE memories SET occurrences = occurrences + ?, updated_at = ? WHERE id = ?",
+                (count, datetime.utcnow().isoformat(), memory_id)
+            )
+            self._conn.commit()
+            if cursor.rowcount == 0:
+                return None
+            return self._conn.execute("SELECT doc_id FROM memories WHERE id = ?", (memory_id,)).fetchone()[0]
+
+    def ids_for_doc_ids(self, doc_ids: List[str]) -> Dict[str, int]:
+        """doc_id -> id for the doc_ids already stored"""
+        if not doc_ids:
+            return {}
+        placeholders = ",".join("?" * len(doc_ids))
+        with self._reading() as conn:
+            return {
+                row[0]: row[1] for row in conn.execute(
+                    f"SELECT doc_id, id FROM memories WHERE doc_id IN ({placeholders})", list(doc_ids)
+                )
+            }
+
+    def existing_doc_ids(self, doc_ids: List[str]) -> set:
+        """The subset of doc_ids already stored (as a memory or merged into one)"""
+        return set(self.ids_for_doc_ids(doc_ids)) | set(self.aliases(doc_ids))
+
+    def aliases(self, doc_ids: List[str]) -> Dict[str, int]:
+        """doc_id -> id of the memory it was merged into, for merged doc_ids"""
+        if not doc_ids:
+            return {}
+        placeholders = ",".join("?" * len(doc_ids))
+        with self._reading() as conn:
+            return {
+                row[0]: row[1] for row in conn.execute(
+                    f"SELECT doc_id, id FROM memory_aliases WHERE doc_id IN ({placeholders})", list(doc_ids)
+                )
+            }
+
+    def add_aliases(self, aliases: Dict[str, int]):
+        """Record doc_ids merged into existing memories (doc_id -> memory id)"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO memory_aliases (doc_id, id) VALUES (?, ?)",
+                [(doc_id, int(memory_id)) for doc_id, memory_id in aliases.items()]
+            )
+            self._conn.commit()
+
+    def remove_aliases(self, doc_ids: List[str]):
+        """Forget that doc_ids were merged into other memories"""
+        with self._lock:
+            self._conn.executemany("DELETE FROM memory_aliases WHERE doc_id = ?", [(doc_id,) for doc_id in doc_ids])
+            self._conn.commit()
+
+    def delete_many(self, ids: List[int]) -> int:
+        """
+        Delete memories (and the doc_ids merged into them) and record them
+        as tombstones, in one transaction
+
+        Returns:
+            Number of memories deleted
+        """
+        if not ids:
+            return 0
+        ids = [int(i) for i in ids]
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            if self.keyword_search_enabled:
+                # External-content FTS tables need the old text to delete a row
+                self._conn.execute(
+                    "INSERT INTO memories_fts (memories_fts, rowid, text) "
+                    f"SELECT 'delete', id, text FROM memories WHERE id IN ({placeholders})",
+                    ids
+                )
+            deleted = self._conn.execute(f"DELETE FROM memories WHERE id IN ({placeholders})", ids).rowcount
+            self._conn.execute(f"DELETE FROM memory_aliases WHERE id IN ({placeholders})", ids)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO memory_tombstones (id) VALUES (?)",
+                [(i,) for i in ids]
+            )
+            self._conn.commit()
+        return deleted
+
+    def tombstones(self) -> np.ndarray:
+        """Ids deleted since the tombstones were last cleared"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT id FROM memory_tombstones ORDER BY id")
+            return np.fromiter((row[0] for row in cursor), dtype=np.int64)
+
+    def clear_tombstones(self, ids: List[int]):
+        """Forget tombstones once the index no longer holds their vectors"""
+        with self._lock:
+            self._conn.executemany("DELETE FROM memory_tombstones WHERE id = ?", [(int(i),) for i in ids])
+            self._conn.commit()
+
+    def memory_types(self) -> List[Optional[str]]:
+        """Distinct memory types stored (None for memories without a type)"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT type FROM memories")]
+
+    def expired_ids(
+        self,
+        memory_type: Optional[str],
+        max_age_days: int = 0,
+        max_count: int = 0
+    ) -> List[int]:
+        """
+        Ids of memories of memory_type outside a retention policy
+
+        Age counts from the last occurrence, so memories that keep
+        recurring are retained. Beyond max_count the least recently seen
+        memories expire. Zero disables either limit.
+        """
+        ids = set()
+        with self._lock:
+            if max_age_days > 0:
+                cutoff = (datetime.utcnow() - timedelta(days=max_age_days)).isoformat()
+                ids.update(row[0] for row in self._conn.execute(
+                    "SELECT id FROM memories WHERE type IS ? AND updated_at < ?",
+                    (memory_type, cutoff)
+                ))
+            if max_count > 0:
+                ids.update(row[0] for row in self._conn.execute(
+                    "SELECT id FROM memories WHERE type IS ? "
+                    "ORDER BY updated_at DESC, id DESC LIMIT -1 OFFSET ?",
+                    (memory_type, max_count)
+                ))
+        return sorted(ids)
+
+    def get_many(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Records for the given ids (missing ids are omitted)"""
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._reading() as conn:
+            rows = conn.execute(
+                f"SELECT id, doc_id, text, metadata, occurrences, updated_at FROM memories "
+                f"WHERE id IN ({placeholders})",
+                [int(i) for i in ids]
+            ).fetchall()
+        return {
+            row[0]: {
+                "id": row[1],
+                "text": row[2],
+                "metadata": json.loads(row[3]),
+                "occurrences": row[4],
+                "last_seen": row[5]
+            }
+            for row in rows
+        }
+
+    def iter_embeddings(
+        self,
+        after_seq: int = -1,
+        upto_seq: Optional[int] = None,
+        chunk_size: int = 10000
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield (ids, vectors) chunks in write order for after_seq < seq <= upto_seq
+
+        The lock is held per chunk only, so writers are not blocked for
+        the whole scan.
+        """
+        last = after_seq
+        while True:
+            query = "SELECT seq, id, embedding FROM memories WHERE seq > ?"
+            params = [last]
+            if upto_seq is not None:
+                query += " AND seq <= ?"
+                params.append(upto_seq)
+            query += " ORDER BY seq LIMIT ?"
+            params.append(chunk_size)
+
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            if not rows:
+                return
+
+            ids = np.array([row[1] for row in rows], dtype=np.int64)
+            vectors = np.stack([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+            yield ids, vectors
+            last = rows[-1][0]
+
+    def iter_texts(self, chunk_size: int = 500) -> Iterator[Tuple[List[int], List[str]]]:
+        """Yield (ids, texts) chunks of every memory in id order, locking per chunk"""
+        last = -1  # ids are non-negative
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, text FROM memories WHERE id > ? ORDER BY id LIMIT ?", (last, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [row[0] for row in rows], [row[1] for row in rows]
+
+    def changed_ids(self, after_seq: int, upto_seq: Optional[int] = None) -> np.ndarray:
+        """Sorted ids of memories inserted or updated with after_seq < seq <= upto_seq"""
+        query = "SELECT id FROM memories WHERE seq > ?"
+        params = [after_seq]
+        if upto_seq is not None:
+            query += " AND seq <= ?"
+            params.append(upto_seq)
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            return np.sort(np.fromiter((row[0] for row in cursor), dtype=np.int64))
+
+    def get_embeddings(self, ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, vectors) for the given ids (missing ids are omitted)"""
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+        placeholders = ",".join("?" * len(ids))
+        with self._reading() as conn:
+            rows = conn.execute(
+                f"SELECT id, embedding FROM memories WHERE id IN ({placeholders})",
+                [int(i) for i in ids]
+            ).fetchall()
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+        return (
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        )
+
+    def filtered_embeddings(
+        self,
+        filters: Dict[str, Any],
+        limit: int
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (ids, vectors) of every memory matching filters, or None if more than limit match
+
+        Lets small filtered searches be scored exactly over just the
+        matching vectors.
+        """
+        where, params = _filter_clause(filters)
+        with self._reading() as conn:
+            rows = conn.execute(
+                f"SELECT id, embedding FROM memories WHERE {where} LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+
+        if len(rows) > limit:
+            return None
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        if not rows:
+            return ids, np.zeros((0, 0), dtype=np.float32)
+        return ids, np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+
+    def keyword_search(
+        self,
+        query: str,
+        k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 top-k over memory text
+
+        Every whitespace-separated term of the query is matched as a
+        phrase, so identifiers such as "training-2025-01-02" must appear
+        intact; documents matching more (and rarer) terms rank higher.
+
+        Returns:
+            (ids, scores), best first; higher scores are better
+        """
+        match = _fts_query(query)
+        if not match or not self.keyword_search_enabled:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        where, params = _filter_clause(filters or {})
+        with self._reading() as conn:
+            rows = conn.execute(
+                "SELECT memories.id, bm25(memories_fts) FROM memories_fts "
+                "JOIN memories ON memories.id = memories_fts.rowid "
+                f"WHERE memories_fts MATCH ? AND {where} "
+                "ORDER BY bm25(memories_fts) LIMIT ?",
+                [match] + params + [k]
+            ).fetchall()
+
+        # SQLite's bm25() is negated so that ascending order is best first
+        return (
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.array([-row[1] for row in rows], dtype=np.float32)
+        )
+
+    def filtered_ids(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Ids of every memory matching filters"""
+        where, params = _filter_clause(filters)
+        with self._reading() as conn:
+            cursor = conn.execute(f"SELECT id FROM memories WHERE {where}", params)
+            return np.fromiter((row[0] for row in cursor), dtype=np.int64)
+
+    def sample_embeddings(self, size: int, upto_seq: Optional[int] = None) -> np.ndarray:
+        """Random sample of up to size embeddings (for index training)"""
+        query = "SELECT embedding FROM memories"
+        params = []
+        if upto_seq is not None:
+            query += " WHERE seq <= ?"
+            params.append(upto_seq)
+        query += " ORDER BY RANDOM() LIMIT ?"
+        params.append(size)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return np.stack([np.frombuffer(row[0], dtype=np.float32) for row in rows])
+
+    def encoder(self) -> Optional[str]:
+        """Identity of the encoder the stored embeddings came from (None if unrecorded)"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM memory_info WHERE key = 'encoder'").fetchone()
+        return row[0] if row else None
+
+    def set_encoder(self, identity: str):
+        """Record the encoder the stored embeddings came from"""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO memory_info (key, value) VALUES ('encoder', ?)", (identity,))
+            self._conn.commit()
+
+    def max_seq(self) -> int:
+        """Latest committed write sequence number, or -1 before the first write"""
+        with self._lock:
+            return self._seq
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._conn.close()
+
+
+def _filter_value(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _filter_clause(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """SQL condition for field equality filters; a list value matches any of its items"""
+    conditions, params = [], []
+    for field, value in filters.items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"{field} is not a filterable field")
+        if isinstance(value, (list, tuple, set)):
+            values = [_filter_value(v) for v in value]
+            conditions.append(f"{field} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        else:
+            conditions.append(f"{field} = ?")
+            params.append(_filter_value(value))
+    return " AND ".join(conditions) or "1", params
+
+
+def _fts_query(query: str) -> str:
+    """FTS5 query matching any query term, each term quoted as a phrase"""
+    terms = [term for term in query.split() if re.search(r"\w", term)]
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
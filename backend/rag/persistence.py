@@ -0,0 +1,110 @@
+"""
+Memory index persistence
+Generation-numbered FAISS snapshots described by a manifest
+"""
+from typing import Any, Dict, Optional
+from datetime import datetime
+import json
+import logging
+import os
+
+import faiss
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+# Snapshots hold unit-length vectors compared by inner product; snapshots
+# written without this marker (L2 over raw vectors) are rebuilt on load
+METRIC = "cosine"
+
+# Map the snapshot read-only instead of copying it into memory when FAISS
+# supports it, so load time does not depend on index size
+MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+class IndexSnapshots:
+    """
+    Writes and loads index snapshots in a directory
+
+    Each snapshot is index-<generation>.faiss and covers every memory write
+    up to the manifest's last_seq. The manifest is replaced atomically after the
+    index file is complete, so a crash mid-snapshot leaves the previous
+    generation in place.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        """Current manifest, or None before the first snapshot"""
+        path = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def last_seq(self) -> int:
+        """Write sequence number the current snapshot covers, -1 before the first"""
+        manifest = self.manifest()
+        if manifest is None:
+            return -1
+        # Older snapshots were keyed by the last (then sequential) memory id,
+        # which the seq column was backfilled from
+        return manifest.get("last_seq", manifest.get("last_id", -1))
+
+    def load(self, mmap: bool = True) -> Optional[faiss.Index]:
+        """
+        Load the current snapshot
+
+        Args:
+            mmap: Map the file read-only (the index cannot be modified);
+                otherwise read a private, writable copy
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            return None
+        path = os.path.join(self.directory, manifest["index_file"])
+        return faiss.read_index(path, MMAP_FLAGS if mmap else 0)
+
+    def save(
+        self,
+        index: faiss.Index,
+        last_seq: int,
+        index_type: str = "flat",
+        encoder: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Write index (of vectors from encoder) as the next generation and make it current"""
+        previous = self.manifest()
+        generation = previous["generation"] + 1 if previous else 1
+        index_file = f"index-{generation:08d}.faiss"
+
+        tmp_path = os.path.join(self.directory, f".{index_file}.tmp")
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, os.path.join(self.directory, index_file))
+
+        manifest = {
+            "generation": generation,
+            "index_file": index_file,
+            "last_seq": last_seq,
+            "ntotal": index.ntotal,
+            "index_type": index_type,
+            "metric": METRIC,
+            "encoder": encoder,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        tmp_manifest = os.path.join(self.directory, f".{MANIFEST}.tmp")
+        with open(tmp_manifest, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, os.path.join(self.directory, MANIFEST))
+
+        if previous:
+            # Already-mapped pages stay readable after unlink
+            try:
+                os.remove(os.path.join(self.directory, previous["index_file"]))
+            except OSError:
+                pass
+
+        logger.info(f"Saved memory index snapshot {generation} ({index.ntotal} vectors)")
+        return manifest
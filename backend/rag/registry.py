@@ -0,0 +1,38 @@
+"""
+Process-wide RAG components
+Every router shares one MemoryStore (and therefore one encoder and one index)
+"""
+import asyncio
+import logging
+import threading
+
+from backend.config import settings
+from backend.rag.encoder import get_encoder
+from backend.rag.memory_store import MemoryStore
+
+logger = logging.getLogger(__name__)
+
+_memory_store = None
+_memory_store_lock = threading.Lock()
+
+
+def get_memory_store() -> MemoryStore:
+    """Return the shared memory store, creating it on first call"""
+    global _memory_store
+    if _memory_store is None:
+        with _memory_store_lock:
+            if _memory_store is None:
+                _memory_store = MemoryStore(
+                    use_pinecone=False,  # Use FAISS for free tier
+                    persist_dir=settings.memory_store_dir or None
+                )
+    return _memory_store
+
+
+async def warm_up():
+    """Load the embedding model in a worker thread so the first request doesn't pay for it"""
+    try:
+        await asyncio.to_thread(get_encoder)
+        logger.info("Embedding model loaded")
+    except Exception as e:
+        logger.error(f"Embedding model warm-up failed: {e}")
@@ -0,0 +1,187 @@
+"""
+Memory Rehydration - Rebuild the memory store from the database
+Streams agent_decisions / experiment_logs into the vector index in the background
+"""
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from sqlalchemy import func, select
+
+from backend.database.connection import get_db
+from backend.database.models import AgentDecision, ExperimentLog
+from backend.ingest.metrics import naive_utc
+from backend.rag.memory_store import MemoryStore, decision_memory, experiment_memory, retention_policy
+
+logger = logging.getLogger(__name__)
+
+# Source tables, by table name -> (model, memory type)
+SOURCES = {
+    AgentDecision.__tablename__: (AgentDecision, "decision"),
+    ExperimentLog.__tablename__: (ExperimentLog, "experiment"),
+}
+
+
+def decision_doc_id(decision_id: int) -> str:
+    """Memory doc_id of an agent_decisions row"""
+    return f"decision_{decision_id}"
+
+
+def experiment_doc_id(row: ExperimentLog) -> str:
+    """Memory doc_id of an experiment_logs row (its embedding_id once assigned)"""
+    return row.embedding_id or f"experiment_{row.experiment_id or row.id}"
+
+
+class Rehydrator:
+    """
+    Re-creates memories for database rows the memory store lacks
+
+    Rows are read newest first in keyset chunks, one short transaction
+    each. Rows whose doc_id is already stored (or was merged into a
+    near-duplicate memory) are skipped without encoding; the rest of a chunk is encoded as one batch (texts still in
+    the embedding cache are not re-encoded) and keeps its original
+    timestamps. Rows outside the retention policy of their memory type
+    are never read, so eviction and rehydration don't undo each other.
+    """
+
+    def __init__(self, memory_store: MemoryStore, chunk_size: int = 500, enabled: bool = True):
+        self.memory_store = memory_store
+        self.chunk_size = chunk_size
+        # idle | running | ready | failed | cancelled | skipped | disabled
+        self.status = "idle" if enabled else "disabled"
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.tables = {table: {"total": 0, "processed": 0, "added": 0} for table in SOURCES}
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    async def run(self):
+        """Rehydrate every source table, then merge the new memories into the base index"""
+        if self.memory_store.use_pinecone:
+            self.status = "skipped"  # Pinecone keeps its own copy
+            return
+
+        self.status = "running"
+        self.started_at = datetime.utcnow()
+        try:
+            for table in SOURCES:
+                self.tables[table]["total"] = await asyncio.to_thread(self._count, table)
+            for table in SOURCES:
+                await self._rehydrate(table)
+
+            await asyncio.to_thread(self.memory_store.snapshot)
+            self.status = "ready"
+            added = sum(progress["added"] for progress in self.tables.values())
+            logger.info(f"Memory rehydration finished: {added} memories restored")
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Memory rehydration failed: {e}")
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.finished_at = datetime.utcnow()
+
+    def progress(self) -> Dict[str, Any]:
+        """Readiness and per-table progress (progress is None when rehydration never runs)"""
+        total = sum(progress["total"] for progress in self.tables.values())
+        processed = sum(progress["processed"] for progress in self.tables.values())
+        if self.status in ("disabled", "skipped"):
+            fraction = None
+        else:
+            fraction = min(processed / total, 1.0) if total else float(self.status == "ready")
+        return {
+            "status": self.status,
+            "progress": fraction,
+            "tables": self.tables,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error
+        }
+
+    async def _rehydrate(self, table: str):
+        """Stream one table into the memory store"""
+        progress = self.tables[table]
+        before = None
+        while progress["processed"] < progress["total"]:
+            limit = min(self.chunk_size, progress["total"] - progress["processed"])
+            chunk = await asyncio.to_thread(self._fetch, table, before, limit)
+            if not chunk:
+                break
+
+            existing = self.memory_store.metadata_store.existing_doc_ids([row["doc_id"] for row in chunk])
+            missing = [row for row in chunk if row["doc_id"] not in existing]
+            if missing:
+                await self.memory_store.store_many(
+                    [row["text"] for row in missing],
+                    [row["metadata"] for row in missing],
+                    [row["doc_id"] for row in missing],
+                    [row["timestamp"] for row in missing]
+                )
+
+            progress["processed"] += len(chunk)
+            progress["added"] += len(missing)
+            before = chunk[-1]["id"]
+
+    def _filters(self, table: str) -> tuple:
+        """(where clauses, row limit) applying the memory retention policy"""
+        model, memory_type = SOURCES[table]
+        policy = retention_policy(memory_type)
+        where = []
+        if policy["max_age_days"] > 0:
+            where.append(model.timestamp >= datetime.utcnow() - timedelta(days=policy["max_age_days"]))
+        return where, policy["max_count"] or None
+
+    def _count(self, table: str) -> int:
+        """Rows of table that rehydration will read"""
+        model, _ = SOURCES[table]
+        where, limit = self._filters(table)
+        with get_db() as db:
+            total = db.execute(select(func.count()).select_from(model).where(*where)).scalar_one()
+        return min(total, limit) if limit else total
+
+    def _fetch(self, table: str, before: Optional[int], limit: int) -> List[Dict[str, Any]]:
+        """Next chunk of rows (newest first, ids below before) as memory records"""
+        model, _ = SOURCES[table]
+        where, _ = self._filters(table)
+        if before is not None:
+            where.append(model.id < before)
+
+        with get_db() as db:
+            rows = db.execute(
+                select(model).where(*where).order_by(model.id.desc()).limit(limit)
+            ).scalars().all()
+            return [_memory_record(row) for row in rows]
+
+
+def _memory_record(row) -> Dict[str, Any]:
+    """Memory for a source row; experiment rows get their embedding_id assigned"""
+    timestamp = naive_utc(row.timestamp) if row.timestamp is not None else None
+    if isinstance(row, AgentDecision):
+        doc_id = decision_doc_id(row.id)
+        text, metadata = decision_memory(row.decision_type, row.reasoning or "", row.outcome or {}, timestamp)
+    else:
+        doc_id = experiment_doc_id(row)
+        row.embedding_id = doc_id  # committed with the chunk's transaction
+        text, metadata = experiment_memory(
+            row.experiment_type or "experiment",
+            row.description or "",
+            row.metrics or {},
+            bool(row.success),
+            timestamp
+        )
+        if row.model_name:
+            metadata["model_name"] = row.model_name
+
+    return {
+        "id": row.id,
+        "doc_id": doc_id,
+        "text": text,
+        "metadata": metadata,
+        "timestamp": timestamp.isoformat() if timestamp else None
+    }
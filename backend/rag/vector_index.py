@@ -0,0 +1,486 @@
+"""
+Segmented FAISS index
+A read-only base segment (usually an mmapped snapshot) plus an in-memory delta,
+published as immutable views so searches never wait for writes
+"""
+from typing import Optional, Tuple
+import hashlib
+import threading
+
+import faiss
+import numpy as np
+
+from backend.config import settings
+
+INDEX_TYPES = ("flat", "hnsw", "ivf", "sq8", "pq", "ivf_sq8", "ivf_pq")
+
+# Types whose codes are lossy; their candidates are re-scored exactly
+QUANTIZED_TYPES = ("sq8", "pq", "ivf_sq8", "ivf_pq")
+
+
+def index_factory_string(index_type: str) -> str:
+    """
+    FAISS factory description for a configured index type
+
+    IVF types store memory ids natively. Wrapping them in IDMap would break
+    remove_ids: IDMap compacts its id map as if the inner index shifted
+    its remaining rows down (as flat ones do), which IVF lists do not.
+    Every other type is ID-mapped.
+    """
+    nlist = settings.memory_ivf_nlist
+    pq = f"PQ{settings.memory_pq_m}x8"
+    factories = {
+        "flat": "IDMap,Flat",
+        "hnsw": f"IDMap,HNSW{settings.memory_hnsw_m},Flat",
+        "ivf": f"IVF{nlist},Flat",
+        "sq8": "IDMap,SQ8",  # 1 byte per dimension
+        "pq": f"IDMap,{pq}",  # memory_pq_m bytes per vector
+        "ivf_sq8": f"IVF{nlist},SQ8",
+        "ivf_pq": f"IVF{nlist},{pq}",
+    }
+    if index_type not in factories:
+        raise ValueError(f"index type must be one of {list(INDEX_TYPES)}")
+    return factories[index_type]
+
+
+def needs_training(index_type: str) -> bool:
+    """Whether the type learns from data (and so needs enough vectors first)"""
+    return index_type in ("ivf", "pq", "ivf_sq8", "ivf_pq")
+
+
+def removes_in_place(index: faiss.Index) -> bool:
+    """
+    Whether remove_ids on index leaves every other id on its own vector
+
+    False for HNSW (cannot remove) and for ID-mapped IVF indexes, which
+    snapshots written before IVF stored ids natively still are.
+    """
+    if not hasattr(index, "id_map"):
+        return True
+    inner = faiss.downcast_index(index.index)
+    return not isinstance(inner, faiss.IndexHNSW) and faiss.try_extract_index_ivf(inner) is None
+
+
+def index_ids(index: faiss.Index) -> np.ndarray:
+    """Ids stored in an ID-mapped or IVF index"""
+    if hasattr(index, "id_map"):
+        return faiss.vector_to_array(index.id_map).astype(np.int64)
+
+    invlists = faiss.extract_index_ivf(index).invlists
+    parts = [np.zeros(0, dtype=np.int64)]
+    for list_no in range(invlists.nlist):
+        size = invlists.list_size(list_no)
+        if size:
+            ids = invlists.get_ids(list_no)
+            parts.append(faiss.rev_swig_ptr(ids, size).astype(np.int64))
+            invlists.release_ids(list_no, ids)
+    return np.concatenate(parts)
+
+
+def build_index(index_type: str, dimension: int, metric: int = faiss.METRIC_INNER_PRODUCT) -> faiss.Index:
+    """Empty index of the given type; IVF indexes still need training"""
+    index = faiss.index_factory(dimension, index_factory_string(index_type), metric)
+    if index_type == "hnsw":
+        faiss.downcast_index(index.index).hnsw.efConstruction = settings.memory_hnsw_ef_construction
+    return configure_search(index, index_type)
+
+
+def configure_search(index: faiss.Index, index_type: str) -> faiss.Index:
+    """Apply the configured speed/recall knobs to a (possibly loaded) index"""
+    if index_type == "hnsw":
+        faiss.ParameterSpace().set_index_parameter(index, "efSearch", settings.memory_hnsw_ef_search)
+    elif index_type.startswith("ivf"):
+        faiss.ParameterSpace().set_index_parameter(index, "nprobe", settings.memory_ivf_nprobe)
+    return index
+
+
+def search_parameters(index_type: Optional[str], selector: faiss.IDSelector) -> Optional[faiss.SearchParameters]:
+    """
+    Search parameters restricting an index of index_type to selector's ids
+
+    Returns None for types without selector support (PQ).
+    """
+    if index_type == "hnsw":
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=settings.memory_hnsw_ef_search)
+    if index_type and index_type.startswith("ivf"):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=settings.memory_ivf_nprobe)
+    if index_type == "pq":
+        return None
+    return faiss.SearchParameters(sel=selector)
+
+
+def exact_search(
+    queries: np.ndarray,
+    ids: np.ndarray,
+    vectors: np.ndarray,
+    k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Brute-force inner-product top-k of each query over a small candidate set"""
+    queries = np.array(queries, dtype=np.float32, ndmin=2)
+    distances = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    result_ids = np.full((len(queries), k), -1, dtype=np.int64)
+    if len(ids) == 0:
+        return distances, result_ids
+
+    scores = queries @ normalize(vectors).T
+    top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    distances[:, :top.shape[1]] = np.take_along_axis(scores, top, axis=1)
+    result_ids[:, :top.shape[1]] = ids[top]
+    return distances, result_ids
+
+
+def stable_id(doc_id: str) -> int:
+    """
+    Index id of a memory: 63 bits of a hash of its doc_id
+
+    Non-negative so it fits FAISS's int64 ids (where -1 means "no
+    result"); collisions are negligible below billions of memories.
+    """
+    digest = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & 0x7FFF_FFFF_FFFF_FFFF
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Unit-length float32 copy, so inner product equals cosine similarity"""
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+class IndexView:
+    """
+    Immutable state of a SegmentedIndex at one point in time
+
+    Readers search a view without locking; writers publish a new view
+    instead of modifying this one.
+    """
+
+    __slots__ = ("base", "base_type", "base_last_seq", "base_ids", "deleted", "delta")
+
+    def __init__(
+        self,
+        base: Optional[faiss.Index] = None,
+        base_type: Optional[str] = None,
+        base_last_seq: int = -1,
+        base_ids: Optional[np.ndarray] = None,
+        deleted: Optional[np.ndarray] = None,
+        delta: Tuple[Tuple[np.ndarray, np.ndarray], ...] = ()
+    ):
+        self.base = base  # never modified once in a view
+        self.base_type = base_type
+        self.base_last_seq = base_last_seq
+        self.base_ids = _frozen(base_ids if base_ids is not None else np.zeros(0, dtype=np.int64))  # sorted
+        # Ids whose base vector is deleted or superseded (a subset of base_ids)
+        self.deleted = _frozen(deleted if deleted is not None else np.zeros(0, dtype=np.int64))
+        self.delta = delta  # (ids, vectors) blocks, oldest first
+
+    def replace(self, **changes) -> "IndexView":
+        """Copy of this view with some fields changed"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return IndexView(**fields)
+
+    @property
+    def delta_count(self) -> int:
+        return sum(len(ids) for ids, _ in self.delta)
+
+
+class SegmentedIndex:
+    """
+    Two-segment vector index searched as one
+
+    The base segment is an immutable snapshot of any index type (flat,
+    HNSW, IVF) built in the background; vectors written since then go to
+    a delta segment of immutable, exactly scored blocks. Ids are stable,
+    so an upsert replaces the delta copy and masks the base copy of a
+    vector, and a removal masks it, until the next snapshot rebuilds the
+    base without it.
+
+    Searches run on the current IndexView without taking a lock, so any
+    number of them proceed in parallel (FAISS and numpy release the GIL)
+    while writers, serialized among themselves, publish new views.
+    """
+
+    def __init__(self, dimension: int, metric: int = faiss.METRIC_INNER_PRODUCT):
+        self.dimension = dimension
+        self.metric = metric
+        self._view = IndexView()
+        self._write_lock = threading.Lock()
+
+    def view(self) -> IndexView:
+        """The current immutable view"""
+        return self._view
+
+    def new_flat(self) -> faiss.Index:
+        """Empty ID-mapped flat index with this index's dimension and metric"""
+        return faiss.IndexIDMap(faiss.IndexFlat(self.dimension, self.metric))
+
+    @property
+    def base(self) -> Optional[faiss.Index]:
+        return self._view.base
+
+    @property
+    def base_type(self) -> Optional[str]:
+        return self._view.base_type
+
+    @property
+    def base_last_seq(self) -> int:
+        return self._view.base_last_seq
+
+    @property
+    def base_ids(self) -> np.ndarray:
+        return self._view.base_ids
+
+    @property
+    def deleted(self) -> np.ndarray:
+        return self._view.deleted
+
+    @property
+    def ntotal(self) -> int:
+        """Live vectors (masked base slots excluded)"""
+        view = self._view
+        base = view.base.ntotal if view.base is not None else 0
+        return base + view.delta_count - len(view.deleted)
+
+    @property
+    def deleted_ratio(self) -> float:
+        """Fraction of base slots holding deleted or superseded vectors"""
+        view = self._view
+        if view.base is None or view.base.ntotal == 0:
+            return 0.0
+        return len(view.deleted) / view.base.ntotal
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Add vectors (one per row) under ids that are not in the index yet"""
+        block = (
+            _frozen(np.array(ids, dtype=np.int64)),
+            _frozen(np.array(vectors, dtype=np.float32, ndmin=2))
+        )
+        with self._write_lock:
+            self._view = self._view.replace(delta=_append_block(self._view.delta, block))
+
+    def upsert(self, ids: np.ndarray, vectors: np.ndarray):
+        """Add vectors (one per row), replacing any existing vectors with the same ids"""
+        block = (
+            _frozen(np.array(ids, dtype=np.int64)),
+            _frozen(np.array(vectors, dtype=np.float32, ndmin=2))
+        )
+        with self._write_lock:
+            view = self._removed(self._view, block[0])
+            self._view = view.replace(delta=_append_block(view.delta, block))
+
+    def remove(self, ids: np.ndarray):
+        """
+        Remove ids from search results
+
+        Delta vectors are dropped immediately; base vectors are masked
+        until the next base is built without them.
+        """
+        with self._write_lock:
+            self._view = self._removed(self._view, np.asarray(ids, dtype=np.int64))
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        ids: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest neighbours of each query across both segments
+
+        Args:
+            queries: One query vector per row
+            k: Results per query
+            ids: Optional ids to restrict the search to
+
+        Returns:
+            (distances, ids), each of shape (len(queries), k); missing
+            results have id -1
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if ids is not None:
+            ids = np.ascontiguousarray(ids, dtype=np.int64)
+
+        view = self._view
+        parts = []
+        if view.base is not None and view.base.ntotal > 0:
+            parts.append(self._search_segment(view.base, view.base_type, queries, k, ids, view.deleted))
+        for block_ids, block_vectors in view.delta:
+            parts.append(self._search_block(block_ids, block_vectors, queries, k, ids))
+
+        if not parts:
+            return (
+                np.zeros((len(queries), k), dtype=np.float32),
+                np.full((len(queries), k), -1, dtype=np.int64)
+            )
+        if len(parts) == 1:
+            return parts[0]
+
+        distances = np.hstack([part[0] for part in parts])
+        ids = np.hstack([part[1] for part in parts])
+        return self._top_k(distances, ids, k)
+
+    def set_base(
+        self,
+        base: faiss.Index,
+        last_seq: int,
+        index_type: str = "flat",
+        merged: Optional[np.ndarray] = None,
+        masked: Optional[np.ndarray] = None
+    ):
+        """
+        Install a new base covering every write up to last_seq
+
+        Args:
+            merged: Ids whose delta vectors the base now holds (dropped
+                from the delta unless also masked)
+            masked: Ids deleted or rewritten after last_seq; their base
+                vectors, if any, are hidden
+        """
+        merged = np.zeros(0, dtype=np.int64) if merged is None else np.asarray(merged, dtype=np.int64)
+        masked = np.zeros(0, dtype=np.int64) if masked is None else np.asarray(masked, dtype=np.int64)
+        base_ids = np.sort(index_ids(base))
+
+        with self._write_lock:
+            self._view = IndexView(
+                base=base,
+                base_type=index_type,
+                base_last_seq=last_seq,
+                base_ids=base_ids,
+                deleted=np.intersect1d(masked, base_ids),
+                delta=_without(self._view.delta, np.setdiff1d(merged, masked))
+            )
+
+    @staticmethod
+    def _removed(view: IndexView, ids: np.ndarray) -> IndexView:
+        """view with ids dropped from the delta and masked in the base"""
+        in_base = ids[np.isin(ids, view.base_ids)]
+        return view.replace(
+            delta=_without(view.delta, ids),
+            deleted=np.union1d(view.deleted, in_base) if len(in_base) else view.deleted
+        )
+
+    def _search_block(
+        self,
+        block_ids: np.ndarray,
+        block_vectors: np.ndarray,
+        queries: np.ndarray,
+        k: int,
+        ids: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact top-k over one delta block"""
+        if ids is not None:
+            keep = np.isin(block_ids, ids)
+            block_ids, block_vectors = block_ids[keep], block_vectors[keep]
+
+        distances = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        found = np.full((len(queries), k), -1, dtype=np.int64)
+        if len(block_ids) == 0:
+            return distances, found
+
+        if self.metric == faiss.METRIC_INNER_PRODUCT:
+            scores = queries @ block_vectors.T
+        else:
+            scores = -(
+                (queries ** 2).sum(axis=1)[:, np.newaxis]
+                - 2 * queries @ block_vectors.T
+                + (block_vectors ** 2).sum(axis=1)[np.newaxis]
+            )
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        distances[:, :top.shape[1]] = np.take_along_axis(scores, top, axis=1)
+        found[:, :top.shape[1]] = block_ids[top]
+        if self.metric != faiss.METRIC_INNER_PRODUCT:
+            distances = -distances  # back to L2 distances, smaller is better
+        return distances, found
+
+    def _search_segment(
+        self,
+        segment: faiss.Index,
+        index_type: str,
+        queries: np.ndarray,
+        k: int,
+        ids: Optional[np.ndarray],
+        excluded: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search one segment, keeping only ids (if given) and skipping excluded ids"""
+        if excluded is not None and len(excluded) == 0:
+            excluded = None
+        if ids is None and excluded is None:
+            return segment.search(queries, k)
+
+        # Selectors reference each other, so all of them must stay alive here
+        allowed = faiss.IDSelectorBatch(ids) if ids is not None else None
+        removed = faiss.IDSelectorBatch(excluded) if excluded is not None else None
+        not_removed = faiss.IDSelectorNot(removed) if removed is not None else None
+        if allowed is not None and not_removed is not None:
+            selector = faiss.IDSelectorAnd(allowed, not_removed)
+        else:
+            selector = allowed or not_removed
+
+        params = search_parameters(index_type, selector)
+        if params is not None:
+            return segment.search(queries, k, params=params)
+
+        # No selector support: over-fetch and mask
+        fetch = k if ids is None else max(k, k * segment.ntotal // max(len(ids), 1)) * 2
+        fetch = min(segment.ntotal, fetch + (len(excluded) if excluded is not None else 0))
+        distances, found = segment.search(queries, fetch)
+        keep = np.ones(found.shape, dtype=bool)
+        if ids is not None:
+            keep &= np.isin(found, ids)
+        if excluded is not None:
+            keep &= ~np.isin(found, excluded)
+        return self._top_k(distances, np.where(keep, found, -1), k)
+
+    def _top_k(self, distances: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Merge per-segment result lists, best first"""
+        larger_is_better = self.metric == faiss.METRIC_INNER_PRODUCT
+        missing = -np.inf if larger_is_better else np.inf
+        distances = np.where(ids < 0, missing, distances)
+
+        order = np.argsort(-distances if larger_is_better else distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    """array, made read-only so a published view cannot change under readers"""
+    array.flags.writeable = False
+    return array
+
+
+def _append_block(
+    blocks: Tuple[Tuple[np.ndarray, np.ndarray], ...],
+    block: Tuple[np.ndarray, np.ndarray]
+) -> Tuple[Tuple[np.ndarray, np.ndarray], ...]:
+    """
+    blocks plus block, merging trailing blocks of similar size
+
+    Keeps the delta at O(log n) blocks while copying each vector only
+    O(log n) times, like a binary counter.
+    """
+    blocks = list(blocks) + [block]
+    while len(blocks) > 1 and len(blocks[-1][0]) >= len(blocks[-2][0]):
+        newer_ids, newer_vectors = blocks.pop()
+        older_ids, older_vectors = blocks.pop()
+        blocks.append((
+            _frozen(np.concatenate([older_ids, newer_ids])),
+            _frozen(np.vstack([older_vectors, newer_vectors]))
+        ))
+    return tuple(blocks)
+
+
+def _without(
+    blocks: Tuple[Tuple[np.ndarray, np.ndarray], ...],
+    ids: np.ndarray
+) -> Tuple[Tuple[np.ndarray, np.ndarray], ...]:
+    """blocks with ids removed (only blocks containing them are copied)"""
+    if len(ids) == 0:
+        return blocks
+    result = []
+    for block_ids, block_vectors in blocks:
+        drop = np.isin(block_ids, ids)
+        if not drop.any():
+            result.append((block_ids, block_vectors))
+        elif not drop.all():
+            result.append((_frozen(block_ids[~drop]), _frozen(block_vectors[~drop])))
+    return tuple(result)
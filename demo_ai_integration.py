@@ -3,12 +3,17 @@ Demo: Connect Your AI Model to AURORA
 This example shows how to integrate any AI model with AURORA monitoring
 """
 import time
-import requests
 import random
-from datetime import datetime
 
-# AURORA API endpoint
-AURORA_API = "http://localhost:3000/api/aurora/record"
+import requests
+
+from aurora_client import AuroraClient
+
+# AURORA API root (the web dev server proxies /api to the backend)
+AURORA_URL = "http://localhost:3000"
+
+# Shared batching client: keep-alive connections, background sender thread
+aurora = AuroraClient(AURORA_URL, flush_interval=0.5)
 
 class DemoAIModel:
     """
@@ -20,7 +25,7 @@ class DemoAIModel:
         self.model_name = model_name
         self.predictions_count = 0
         print(f"🤖 Initializing {model_name} with AURORA monitoring...")
-        print(f"📊 Metrics will be sent to: {AURORA_API}")
+        print(f"📊 Metrics will be sent to: {AURORA_URL}")
         print(f"📈 View dashboard at: http://localhost:5174/aurora-monitor\n")
     
     def predict(self, input_data):
@@ -100,31 +105,33 @@ class DemoAIModel:
         2. Detect performance issues
         3. Automatically optimize if needed
         4. Alert you proactively
+        
+        Each prediction goes to the metrics API (history, rollups, agents)
+        and to the monitor that backs the /aurora-monitor dashboard.
         """
+        # Metric history (batched in the background)
+        queued = aurora.log_metrics(
+            self.model_name,
+            accuracy=accuracy,
+            latency_ms=response_time,
+            metadata={"error": error}
+        )
+        
+        if queued:
+            print(f"   ✓ Metrics queued for AURORA")
+        else:
+            print(f"   ⚠️  AURORA buffer full, metrics dropped")
+        
+        # Live /aurora-monitor dashboard (reads query parameters)
         try:
-            payload = {
-                "response_time": response_time,
-                "accuracy": accuracy,
-                "error": error,
-                "model_name": self.model_name,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            response = requests.post(
-                AURORA_API,
-                json=payload,
-                timeout=2
+            response = aurora.post(
+                "/api/aurora/record",
+                params={"response_time": response_time, "accuracy": accuracy, "error": error}
             )
-            
-            if response.status_code == 200:
-                print(f"   ✓ Metrics sent to AURORA")
-            else:
-                print(f"   ⚠️  AURORA returned status {response.status_code}")
-                
-        except requests.exceptions.ConnectionError:
+            if response.status_code != 200:
+                print(f"   ⚠️  AURORA monitor returned status {response.status_code}")
+        except requests.exceptions.RequestException:
             print(f"   ⚠️  AURORA not available (is backend running on port 3000?)")
-        except Exception as e:
-            print(f"   ⚠️  Failed to send to AURORA: {e}")
 
 
 def demo_basic_usage():
@@ -268,6 +275,11 @@ def main():
         print("\n\n👋 Demo interrupted. Goodbye!")
     except Exception as e:
         print(f"\n❌ Error: {e}")
+    finally:
+        aurora.close()
+        stats = aurora.get_stats()
+        if stats["failed"]:
+            print(f"⚠️  {stats['failed']} metrics could not be delivered (is the backend running?)")
 
 
 if __name__ == "__main__":
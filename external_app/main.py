@@ -1,37 +1,51 @@
 from fastapi import FastAPI, BackgroundTasks
-import requests
+import os
+import sys
 import random
 import time
 import uvicorn
 
+# Make the repo-level aurora_client package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aurora_client import AuroraClient
+
 # This is a sample "E-Commerce Recommendation Engine"
 # It runs separately from AURORA.
 
 app = FastAPI(title="Acme E-Commerce API", version="1.0.0")
 
 # Configuration for AURORA connection
-AURORA_URL = "http://localhost:8000/api/metrics"
+AURORA_URL = "http://localhost:8000"
 MODEL_NAME = "acme-recommender-v1"
 
+# One pooled, batching client for the whole process
+aurora = AuroraClient(AURORA_URL)
+
+@app.on_event("shutdown")
+def flush_aurora():
+    """Deliver any buffered metrics before the process exits"""
+    aurora.close()
+
 def log_to_aurora(accuracy: float, latency: float):
     """
     Background task to send metrics to AURORA without blocking the user response.
+    The client only buffers here; batches are shipped by its sender thread.
     """
-    try:
-        payload = {
-            "model_name": MODEL_NAME,
-            "accuracy": accuracy,
-            "latency_ms": latency,
-            "data_drift_score": random.uniform(0.0, 0.1), # Simulated drift check
-            "metadata": {
-                "region": "us-west-1",
-                "customer_tier": "premium"
-            }
+    queued = aurora.log_metrics(
+        MODEL_NAME,
+        accuracy=accuracy,
+        latency_ms=latency,
+        data_drift_score=random.uniform(0.0, 0.1), # Simulated drift check
+        metadata={
+            "region": "us-west-1",
+            "customer_tier": "premium"
         }
-        requests.post(AURORA_URL, json=payload)
+    )
+    if queued:
         print(f"📡 Logged to AURORA: Acc={accuracy:.2f}, Lat={latency:.0f}ms")
-    except Exception as e:
-        print(f"⚠️ Failed to log to log to AURORA: {e}")
+    else:
+        print(f"⚠️ AURORA buffer full, metric dropped")
 
 @app.get("/")
 def home():
@@ -1,13 +1,17 @@
 import time
 import random
-import requests
 import sys
 
+from aurora_client import AuroraClient
+
 # Configuration
-AURORA_API = "http://localhost:8000/api/metrics"
+AURORA_URL = "http://localhost:8000"
 MODEL_NAME = "sentiment-classifier-pro"
 VERSION = "v2.0.1"
 
+# Metrics are batched and sent in the background over a pooled connection
+client = AuroraClient(AURORA_URL, flush_interval=2.0)
+
 def print_status(status, msg):
     color = "\033[92m" if status == "OK" else "\033[91m"
     reset = "\033[0m"
@@ -15,7 +19,7 @@ def print_status(status, msg):
 
 def simulate_inference():
     print("\n🚀 Starting Sample AI Model: " + MODEL_NAME)
-    print(f"📡 Connected to AURORA Monitor at {AURORA_API}")
+    print(f"📡 Connected to AURORA Monitor at {AURORA_URL}")
     print("------------------------------------------------")
     
     # 1. Normal Operation Phase
@@ -32,11 +36,10 @@ def simulate_inference():
             "metadata": {"env": "production", "version": VERSION}
         }
         
-        try:
-            requests.post(AURORA_API, json=payload)
+        if client.log(payload):
             print_status("OK", f"Processed Batch #{i+1} | Acc: {accuracy:.1%} | Latency: {latency:.0f}ms")
-        except:
-            print_status("ERR", "Failed to connect to AURORA")
+        else:
+            print_status("ERR", "AURORA buffer full, metric dropped")
         
         time.sleep(2)
 
@@ -58,17 +61,20 @@ def simulate_inference():
             "metadata": {"env": "production", "version": VERSION}
         }
         
-        try:
-            requests.post(AURORA_API, json=payload)
-            if accuracy < 0.8:
-                 print_status("WARN", f"Processed Batch #{i+11} | Acc: {accuracy:.1%} | Drift: {drift_score:.2f}")
-            else:
-                 print_status("OK", f"Processed Batch #{i+11} | Acc: {accuracy:.1%} | Drift: {drift_score:.2f}")
-        except:
-            print_status("ERR", "Connection Failed")
+        if not client.log(payload):
+            print_status("ERR", "AURORA buffer full, metric dropped")
+        elif accuracy < 0.8:
+             print_status("WARN", f"Processed Batch #{i+11} | Acc: {accuracy:.1%} | Drift: {drift_score:.2f}")
+        else:
+             print_status("OK", f"Processed Batch #{i+11} | Acc: {accuracy:.1%} | Drift: {drift_score:.2f}")
             
         time.sleep(2)
         
+    client.flush(timeout=10)
+    stats = client.get_stats()
+    if stats["failed"]:
+        print_status("ERR", f"{stats['failed']} metrics could not be delivered to AURORA")
+    
     print("\n✅ Simulation Complete. Check AURORA Dashboard for Agent Actions.")
 
 if __name__ == "__main__":
@@ -76,3 +82,5 @@ if __name__ == "__main__":
         simulate_inference()
     except KeyboardInterrupt:
         print("\nStopped.")
+    finally:
+        client.close()
@@ -0,0 +1,118 @@
+"""
+Benchmark memory index types: recall vs memory per vector
+
+Builds every index type over the same vectors and reports index bytes per
+vector, build time, query latency and recall@k against exact search, with
+and without exact re-ranking of memory_rerank_factor * k candidates (what
+MemoryStore does for quantized types).
+
+By default the vectors are synthetic (clustered Gaussian, unit length,
+384-d). Use --from-store to benchmark the embeddings of a real memory store.
+
+    python scripts/benchmark_memory_index.py --n 50000
+    python scripts/benchmark_memory_index.py --from-store ./memory_store
+"""
+import sys
+import os
+import argparse
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import faiss
+import numpy as np
+
+from backend.config import settings
+from backend.rag.metadata_store import MetadataStore
+from backend.rag.vector_index import INDEX_TYPES, build_index, exact_search, needs_training, normalize
+
+
+def synthetic_vectors(n: int, dimension: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors drawn around random cluster centres (embeddings are clustered, not uniform)"""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    assignment = rng.integers(0, clusters, n)
+    vectors = centres[assignment] + 0.6 * rng.standard_normal((n, dimension)).astype(np.float32)
+    return normalize(vectors)
+
+
+def store_vectors(directory: str) -> np.ndarray:
+    """Every embedding in a memory store directory"""
+    store = MetadataStore(os.path.join(directory, "memory.db"))
+    vectors = np.vstack([chunk for _, chunk in store.iter_embeddings()])
+    store.close()
+    return normalize(vectors)
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    """Fraction of the true top-k present in the found top-k"""
+    hits = sum(len(np.intersect1d(f[f >= 0], t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def benchmark(index_type: str, data: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    ids = np.arange(len(data), dtype=np.int64)
+
+    start = time.perf_counter()
+    index = build_index(index_type, data.shape[1])
+    if needs_training(index_type) or not index.is_trained:
+        sample = data[np.random.default_rng(1).choice(len(data), min(len(data), 256 * 64), replace=False)]
+        index.train(sample)
+    index.add_with_ids(data, ids)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    factor = settings.memory_rerank_factor
+    _, candidates = index.search(queries, k * factor)
+    reranked = np.vstack([
+        exact_search(query, row[row >= 0], data[row[row >= 0]], k)[1]
+        for query, row in zip(queries, candidates)
+    ])
+
+    return {
+        "type": index_type,
+        "bytes_per_vector": len(faiss.serialize_index(index)) / len(data),
+        "build_s": build_s,
+        "query_ms": query_ms,
+        "recall": recall(found, truth),
+        "recall_rerank": recall(reranked, truth),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=50000, help="Synthetic vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--from-store", help="Memory store directory to read embeddings from")
+    args = parser.parse_args()
+
+    if args.from_store:
+        vectors = store_vectors(args.from_store)
+        source = f"{len(vectors)} embeddings from {args.from_store}"
+    else:
+        vectors = synthetic_vectors(args.n + args.queries, settings.embedding_dimension, args.clusters)
+        source = f"{args.n} synthetic clustered vectors"
+    data, queries = vectors[args.queries:], vectors[:args.queries]
+
+    _, truth = exact_search(queries, np.arange(len(data), dtype=np.int64), data, args.k)
+
+    print(f"📏 {source}, d={data.shape[1]}, {len(queries)} queries, recall@{args.k}")
+    print(f"   nlist={settings.memory_ivf_nlist} nprobe={settings.memory_ivf_nprobe} "
+          f"pq_m={settings.memory_pq_m} hnsw_m={settings.memory_hnsw_m} "
+          f"ef_search={settings.memory_hnsw_ef_search} rerank_factor={settings.memory_rerank_factor}")
+    print(f"{'type':<9}{'bytes/vec':>11}{'build s':>9}{'query ms':>10}{'recall':>8}{'+rerank':>9}")
+    for index_type in args.types.split(","):
+        row = benchmark(index_type, data, queries, truth, args.k)
+        print(f"{row['type']:<9}{row['bytes_per_vector']:>11.1f}{row['build_s']:>9.2f}"
+              f"{row['query_ms']:>10.3f}{row['recall']:>8.3f}{row['recall_rerank']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
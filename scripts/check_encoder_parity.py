@@ -0,0 +1,109 @@
+"""
+Check that the ONNX encoder's embeddings match the PyTorch encoder's
+
+Encodes the same texts with both backends and compares them per text by
+cosine similarity. Fails (exit code 1) if any text falls below
+--min-cosine, or if the nearest neighbour of a text among the others
+differs between backends for more than --max-neighbour-changes of them.
+Also reports encode time per text for each backend.
+
+    python scripts/check_encoder_parity.py
+    python scripts/check_encoder_parity.py --texts memories.txt --min-cosine 0.98
+"""
+import sys
+import os
+import argparse
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from backend.config import settings
+from backend.rag.encoder import OnnxEncoder
+from backend.rag.memory_store import decision_memory, experiment_memory
+from backend.rag.vector_index import normalize
+
+DECISIONS = ["retrain", "rollback", "scale_up", "route_traffic", "enable_cache", "no_action"]
+REASONS = [
+    "accuracy dropped below 0.80 after data drift in the payments stream",
+    "p95 latency exceeded 800 ms during the evening peak",
+    "error rate spiked to 4% following the v2.3 deployment",
+    "feature distribution shift detected on user_age and session_length",
+    "GPU utilization stayed above 90% for 30 minutes",
+]
+
+
+def sample_texts() -> list:
+    """Memory-shaped texts (decisions and experiments) plus a few edge cases"""
+    texts = [
+        decision_memory(decision, reason, {})[0]
+        for decision in DECISIONS for reason in REASONS
+    ]
+    texts += [
+        experiment_memory("tuning", f"learning rate sweep {lr} on fraud-detector-v{v}", {"summary": "f1 0.91"}, True)[0]
+        for lr in ("1e-3", "3e-4", "1e-4") for v in (1, 2)
+    ]
+    texts += ["", "x", "training-2025-01-02", " ".join(REASONS * 20)]  # empty, tiny, identifier, truncated
+    return texts
+
+
+def timed_encode(encoder, texts: list, batch_size: int) -> tuple:
+    encoder.encode(texts[:2], batch_size=batch_size)  # warm up
+    start = time.perf_counter()
+    embeddings = normalize(encoder.encode(texts, batch_size=batch_size))
+    return embeddings, (time.perf_counter() - start) * 1000 / len(texts)
+
+
+def nearest_neighbours(embeddings: np.ndarray) -> np.ndarray:
+    scores = embeddings @ embeddings.T
+    np.fill_diagonal(scores, -np.inf)
+    return scores.argmax(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=settings.embedding_model_name, help="PyTorch reference model")
+    parser.add_argument("--onnx-dir", default=settings.embedding_onnx_dir)
+    parser.add_argument("--texts", help="File with one text per line (defaults to built-in samples)")
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_max_batch_size)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--max-neighbour-changes", type=float, default=0.05, help="Fraction of texts")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    if args.texts:
+        with open(args.texts) as f:
+            texts = [line.rstrip("\n") for line in f]
+    else:
+        texts = sample_texts()
+
+    reference, torch_ms = timed_encode(SentenceTransformer(args.model, device="cpu"), texts, args.batch_size)
+    candidate, onnx_ms = timed_encode(OnnxEncoder(args.onnx_dir), texts, args.batch_size)
+
+    cosine = (reference * candidate).sum(axis=1)
+    changed = (nearest_neighbours(reference) != nearest_neighbours(candidate)).mean()
+
+    print(f"📏 {len(texts)} texts, {args.model} (torch) vs {args.onnx_dir} (onnx)")
+    print(f"   cosine min={cosine.min():.4f} mean={cosine.mean():.4f}, max |diff|={np.abs(reference - candidate).max():.4f}")
+    print(f"   nearest neighbour changed for {changed:.1%} of texts")
+    print(f"   encode ms/text: torch={torch_ms:.2f} onnx={onnx_ms:.2f}")
+
+    failures = []
+    if cosine.min() < args.min_cosine:
+        worst = int(cosine.argmin())
+        failures.append(f"cosine {cosine[worst]:.4f} < {args.min_cosine} for {texts[worst][:60]!r}")
+    if changed > args.max_neighbour_changes:
+        failures.append(f"nearest neighbour changed for {changed:.1%} > {args.max_neighbour_changes:.1%}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ ONNX encoder is within tolerance")
+
+
+if __name__ == "__main__":
+    main()
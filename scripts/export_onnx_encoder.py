@@ -0,0 +1,103 @@
+"""
+Export the sentence encoder to ONNX (int8) for the onnx embedding backend
+
+Writes model.onnx (dynamically quantized to int8 unless --no-quantize),
+tokenizer.json and encoder_config.json into the output directory, which
+is what embedding_onnx_dir points at. Needs torch, sentence-transformers
+and onnxruntime; the API itself then only needs onnxruntime.
+
+    python scripts/export_onnx_encoder.py
+    python scripts/check_encoder_parity.py
+"""
+import sys
+import os
+import argparse
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from sentence_transformers import SentenceTransformer
+
+from backend.config import settings
+from backend.rag.encoder import ONNX_CONFIG_FILE, ONNX_MODEL_FILE, ONNX_TOKENIZER_FILE
+
+
+class TokenEmbeddings(torch.nn.Module):
+    """Transformer returning only its last hidden state (pooling happens outside ONNX)"""
+
+    def __init__(self, transformer: torch.nn.Module):
+        super().__init__()
+        self.transformer = transformer
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.transformer(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            token_type_ids=token_type_ids
+        )[0]
+
+
+def export(model_name: str, output_dir: str, quantize: bool = True, opset: int = 14):
+    model = SentenceTransformer(model_name, device="cpu")
+    pooling = model[1]
+    if not getattr(pooling, "pooling_mode_mean_tokens", False):
+        raise SystemExit(f"❌ {model_name} does not use mean pooling, which the ONNX backend assumes")
+
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    fp32_path = model_path + ".fp32" if quantize else model_path
+
+    tokenizer = model.tokenizer
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    axes = {0: "batch", 1: "tokens"}
+    torch.onnx.export(
+        TokenEmbeddings(model[0].auto_model).eval(),
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        fp32_path,
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["token_embeddings"],
+        dynamic_axes={
+            "input_ids": axes,
+            "attention_mask": axes,
+            "token_type_ids": axes,
+            "token_embeddings": axes,
+        },
+        opset_version=opset
+    )
+
+    if quantize:
+        # Weights stored as int8, activations quantized on the fly
+        quantize_dynamic(fp32_path, model_path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, ONNX_TOKENIZER_FILE))
+    with open(os.path.join(output_dir, ONNX_CONFIG_FILE), "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "dimension": model.get_sentence_embedding_dimension(),
+            "max_seq_length": model.max_seq_length,
+            "normalize": any(type(module).__name__ == "Normalize" for module in model),
+            "pad_token_id": tokenizer.pad_token_id,
+            "quantized": quantize,
+        }, f, indent=2)
+
+    size_mb = os.path.getsize(model_path) / 1e6
+    print(f"✅ Exported {model_name} to {output_dir} ({size_mb:.1f} MB{', int8' if quantize else ''})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=settings.embedding_model_name)
+    parser.add_argument("--output", default=settings.embedding_onnx_dir)
+    parser.add_argument("--no-quantize", action="store_true", help="Keep float32 weights")
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+
+    export(args.model, args.output, quantize=not args.no_quantize, opset=args.opset)
+
+
+if __name__ == "__main__":
+    main()
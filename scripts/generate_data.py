@@ -2,14 +2,22 @@
 Sample data generator for testing AURORA
 Generates realistic model metrics and system states
 """
+import os
+import sys
 import random
-import asyncio
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
 
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aurora_client import AuroraClient
+
 API_URL = "http://localhost:8000"
 
+# Pooled, batching client shared by every generator below
+client = AuroraClient(API_URL, flush_interval=0.5)
+
 def generate_model_metrics(model_name: str, base_accuracy: float = 0.85):
     """Generate realistic model metrics"""
     
@@ -34,7 +42,7 @@ def generate_model_metrics(model_name: str, base_accuracy: float = 0.85):
         "latency_ms": latency,
         "data_drift_score": drift_score,
         "concept_drift_detected": drift_detected,
-        "meta_data": {
+        "metadata": {
             "timestamp": datetime.utcnow().isoformat(),
             "environment": "production"
         }
@@ -62,23 +70,18 @@ def generate_system_context(model_name: str):
     }
 
 def send_metrics(metrics):
-    """Send metrics to AURORA API"""
-    try:
-        response = requests.post(f"{API_URL}/api/metrics", json=metrics, timeout=5)
-        if response.status_code == 200:
-            print(f"✅ Sent metrics for {metrics['model_name']}: accuracy={metrics['accuracy']:.2%}")
-            return True
-        else:
-            print(f"❌ Failed to send metrics: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Error sending metrics: {e}")
+    """Queue metrics for the next batch sent to the AURORA API"""
+    if client.log(metrics):
+        print(f"✅ Queued metrics for {metrics['model_name']}: accuracy={metrics['accuracy']:.2%}")
+        return True
+    else:
+        print(f"❌ Metrics dropped: client buffer full")
         return False
 
 def trigger_analysis(context):
     """Trigger system analysis"""
     try:
-        response = requests.post(f"{API_URL}/api/analyze", json=context, timeout=30)
+        response = client.post("/api/analyze", json=context, timeout=30)
         if response.status_code == 200:
             result = response.json()
             decision = result.get("critic_decision", {})
@@ -190,3 +193,7 @@ if __name__ == "__main__":
     
     else:
         print("Invalid option")
+    
+    client.close()
+    stats = client.get_stats()
+    print(f"📊 Delivered {stats['sent']} metrics ({stats['failed']} failed, {stats['rejected']} rejected)")
@@ -7,7 +7,9 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.database.connection import init_db
+from backend.database.connection import init_db, get_db
+from backend.database.models import MetricRollup, ModelMetrics
+from backend.database.rollups import backfill_rollups
 import asyncio
 
 async def initialize_database():
@@ -17,6 +19,12 @@ async def initialize_database():
     # Initialize database tables
     init_db()
     
+    # Build rollups for metrics recorded before rollups existed
+    with get_db() as db:
+        if db.query(ModelMetrics.id).first() and not db.query(MetricRollup.id).first():
+            count = backfill_rollups(db)
+            print(f"📈 Built metric rollups from {count} existing metrics")
+    
     print("✅ Database initialized successfully")
     print("📊 Dashboard is ready for your first model connection")
     print("\n🚀 AURORA is ready!")
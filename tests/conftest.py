@@ -0,0 +1,42 @@
+import asyncio
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Make the backend package importable when pytest runs from any directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.config import settings  # noqa: E402
+from backend.rag.memory_store import MemoryStore  # noqa: E402
+
+
+class HashEncoder:
+    """Deterministic stand-in for the sentence encoder (same text and seed, same vector)"""
+
+    def __init__(self, seed: str = ""):
+        self.seed = seed
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.stack([
+            np.random.default_rng(int(hashlib.md5((self.seed + text).encode()).hexdigest()[:8], 16))
+            .standard_normal(settings.embedding_dimension).astype(np.float32)
+            for text in texts
+        ])
+        return embeddings[0] if single else embeddings
+
+
+@pytest.fixture
+def hash_encoder():
+    return HashEncoder
+
+
+@pytest.fixture
+def memory_store():
+    store = MemoryStore(get_encoder=HashEncoder)
+    yield store
+    asyncio.run(store.stop())
@@ -0,0 +1,192 @@
+"""
+Encoder identity of stored memories, the ONNX encoder (against a fake
+runtime), and ONNX / PyTorch parity against a real export
+"""
+from types import SimpleNamespace
+import asyncio
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from backend.config import settings
+from backend.rag.encoder import (
+    ONNX_CONFIG_FILE,
+    ONNX_MODEL_FILE,
+    ONNX_TOKENIZER_FILE,
+    OnnxEncoder,
+    encoder_identity
+)
+from backend.rag.memory_store import MemoryStore, decision_memory
+
+TEXTS = [
+    decision_memory(decision, reason, {})[0]
+    for decision in ("retrain", "rollback", "no_action")
+    for reason in ("accuracy dropped after data drift", "p95 latency exceeded 800 ms")
+]
+
+
+def test_switching_encoder_reembeds_stored_memories(tmp_path, hash_encoder):
+    async def write():
+        store = MemoryStore(get_encoder=lambda: hash_encoder("torch"), persist_dir=str(tmp_path), encoder_id="torch:m")
+        await store.store_many(TEXTS, [{"type": "decision"}] * len(TEXTS), [f"d{i}" for i in range(len(TEXTS))])
+        await store.stop()
+
+    async def reopen():
+        store = MemoryStore(get_encoder=lambda: hash_encoder("onnx"), persist_dir=str(tmp_path), encoder_id="onnx:m")
+        assert store.reembedding and store.index.ntotal == 0  # no vectors of the old encoder
+        assert await store.reembed() == len(TEXTS)
+        results = await store.search(TEXTS[3], top_k=1, mode="vector")
+        await store.stop()
+        return store, results
+
+    asyncio.run(write())
+    store, results = asyncio.run(reopen())
+
+    assert not store.reembedding
+    assert store.metadata_store.encoder() == "onnx:m"
+    assert store.snapshots.manifest()["encoder"] == "onnx:m"
+    assert results[0]["id"] == "d3" and results[0]["vector_score"] == pytest.approx(1.0, abs=1e-5)
+
+
+class FakeEncoding:
+    def __init__(self, ids, attention_mask):
+        self.ids = ids
+        self.attention_mask = attention_mask
+        self.type_ids = [0] * len(ids)
+
+
+class FakeTokenizer:
+    """Whitespace word-level tokenizer with the tokenizers.Tokenizer calls OnnxEncoder makes"""
+
+    def __init__(self, vocab):
+        self.vocab = vocab
+        self.max_length = None
+        self.pad_id = None
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            return cls(json.load(f)["vocab"])
+
+    def enable_truncation(self, max_length):
+        self.max_length = max_length
+
+    def enable_padding(self, pad_id):
+        self.pad_id = pad_id
+
+    def encode_batch(self, texts):
+        ids = [[self.vocab[word] for word in text.split()][:self.max_length] for text in texts]
+        width = max(len(row) for row in ids)
+        return [
+            FakeEncoding(row + [self.pad_id] * (width - len(row)), [1] * len(row) + [0] * (width - len(row)))
+            for row in ids
+        ]
+
+
+class FakeSession:
+    """Token embeddings as rows of a fixed table; takes no token_type_ids, like some exports"""
+
+    def __init__(self, path, sess_options=None, providers=None):
+        self.feeds = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        return [TOKEN_TABLE[feeds["input_ids"]]]
+
+
+VOCAB = {"[PAD]": 0, "accuracy": 1, "dropped": 2, "latency": 3, "rose": 4, "retrain": 5, "model": 6}
+TOKEN_TABLE = np.random.default_rng(0).standard_normal((len(VOCAB), 8)).astype(np.float32)
+TOKEN_TABLE[0] = 100.0  # padding would dominate any unmasked mean
+
+
+def onnx_dir(tmp_path, monkeypatch, **config):
+    onnxruntime = SimpleNamespace(
+        SessionOptions=lambda: SimpleNamespace(),
+        GraphOptimizationLevel=SimpleNamespace(ORT_ENABLE_ALL=99),
+        InferenceSession=FakeSession
+    )
+    monkeypatch.setitem(sys.modules, "onnxruntime", onnxruntime)
+    monkeypatch.setitem(sys.modules, "tokenizers", SimpleNamespace(Tokenizer=FakeTokenizer))
+
+    with open(tmp_path / ONNX_TOKENIZER_FILE, "w") as f:
+        json.dump({"vocab": VOCAB}, f)
+    with open(tmp_path / ONNX_CONFIG_FILE, "w") as f:
+        json.dump({"model_name": "tiny", "dimension": 8, "pad_token_id": 0, "quantized": True, **config}, f)
+    return str(tmp_path)
+
+
+def mean_pooled(text, max_length=None):
+    ids = [VOCAB[word] for word in text.split()][:max_length]
+    embedding = TOKEN_TABLE[ids].mean(axis=0)
+    return embedding / np.linalg.norm(embedding)
+
+
+def test_onnx_encoder_mean_pools_real_tokens_and_normalizes(tmp_path, monkeypatch):
+    encoder = OnnxEncoder(onnx_dir(tmp_path, monkeypatch, max_seq_length=3))
+    texts = ["accuracy dropped", "latency rose model retrain", "retrain", "model accuracy dropped"]
+
+    embeddings = encoder.encode(texts, batch_size=2)
+
+    assert embeddings.shape == (4, 8) and embeddings.dtype == np.float32
+    expected = np.stack([mean_pooled(text, max_length=3) for text in texts])
+    assert np.allclose(embeddings, expected, atol=1e-5)  # input order, padding masked, truncated
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-5)
+    assert all(set(feeds) == {"input_ids", "attention_mask"} for feeds in encoder.session.feeds)
+    assert [len(feeds["input_ids"]) for feeds in encoder.session.feeds] == [2, 2]
+
+
+def test_onnx_encoder_single_text_and_empty_input(tmp_path, monkeypatch):
+    encoder = OnnxEncoder(onnx_dir(tmp_path, monkeypatch))
+
+    assert np.allclose(encoder.encode("latency rose"), mean_pooled("latency rose"), atol=1e-5)
+    assert encoder.encode([]).shape == (0, 8)
+
+
+def test_onnx_encoder_skips_normalization_when_model_has_none(tmp_path, monkeypatch):
+    encoder = OnnxEncoder(onnx_dir(tmp_path, monkeypatch, normalize=False))
+
+    assert np.allclose(encoder.encode("accuracy dropped"), TOKEN_TABLE[[1, 2]].mean(axis=0), atol=1e-5)
+
+
+def test_changing_the_backend_setting_reembeds(tmp_path, monkeypatch, hash_encoder):
+    store_dir = tmp_path / "memories"
+    monkeypatch.setattr(settings, "embedding_backend", "torch")
+    store = MemoryStore(get_encoder=lambda: hash_encoder("torch"), persist_dir=str(store_dir))
+    asyncio.run(store.store_many(TEXTS, [{"type": "decision"}] * len(TEXTS)))
+    asyncio.run(store.stop())
+
+    monkeypatch.setattr(settings, "embedding_backend", "onnx")
+    monkeypatch.setattr(settings, "embedding_onnx_dir", onnx_dir(tmp_path, monkeypatch))
+    assert encoder_identity() == "onnx:tiny:int8"
+
+    store = MemoryStore(get_encoder=lambda: hash_encoder("onnx"), persist_dir=str(store_dir))
+    assert store.reembedding
+    asyncio.run(store.reembed())
+    assert store.metadata_store.encoder() == "onnx:tiny:int8"
+    asyncio.run(store.stop())
+
+    store = MemoryStore(get_encoder=lambda: hash_encoder("onnx"), persist_dir=str(store_dir))
+    assert not store.reembedding and store.index.base.ntotal == len(TEXTS)
+    asyncio.run(store.stop())
+
+
+def test_onnx_encoder_matches_torch():
+    pytest.importorskip("onnxruntime")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    if not os.path.exists(os.path.join(settings.embedding_onnx_dir, ONNX_MODEL_FILE)):
+        pytest.skip("no exported ONNX encoder (run scripts/export_onnx_encoder.py)")
+
+    reference = sentence_transformers.SentenceTransformer(settings.embedding_model_name, device="cpu")
+    candidate = OnnxEncoder(settings.embedding_onnx_dir)
+
+    expected = reference.encode(TEXTS, normalize_embeddings=True)
+    actual = candidate.encode(TEXTS)
+    actual /= np.linalg.norm(actual, axis=1, keepdims=True)
+
+    assert (expected * actual).sum(axis=1).min() >= 0.99
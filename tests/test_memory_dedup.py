@@ -0,0 +1,94 @@
+"""
+Near-duplicate merging in the FAISS memory store
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database.models import Base, AgentDecision
+from backend.rag import rehydration
+from backend.rag.rehydration import Rehydrator, decision_doc_id
+
+
+def test_concurrent_stores_of_the_same_text_merge(memory_store):
+    text = "Decision: no_action. Reasoning: metrics are stable"
+    embedding = asyncio.run(memory_store._embed_many([text]))
+    barrier = threading.Barrier(8)
+
+    def store(_):
+        barrier.wait()
+        return memory_store._store_faiss([text], [{"type": "decision"}], [None], embedding.copy())
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(store, range(8)))
+
+    assert memory_store.metadata_store.count() == 1
+    assert len({doc_ids[0] for doc_ids, _ in results}) == 1
+    assert memory_store.deduplicated == 7
+
+
+def test_repeated_decisions_with_doc_ids_merge(memory_store):
+    async def analyze():
+        # As /api/analyze stores them: one doc_id per agent_decisions row
+        return [
+            await memory_store.store_decision("no_action", "metrics are stable", {}, doc_id=decision_doc_id(i))
+            for i in range(1, 6)
+        ]
+
+    doc_ids = asyncio.run(analyze())
+
+    assert memory_store.metadata_store.count() == 1
+    assert memory_store.deduplicated == 4
+    assert set(doc_ids) == {decision_doc_id(1)}
+    merged = [decision_doc_id(i) for i in range(1, 6)]
+    assert memory_store.metadata_store.existing_doc_ids(merged) == set(merged)
+
+
+def test_upsert_of_a_stored_doc_id_is_not_merged(memory_store):
+    async def store():
+        await memory_store.store_decision("no_action", "metrics are stable", {}, doc_id="decision_1")
+        await memory_store.store_decision("no_action", "metrics are stable", {}, doc_id="decision_2")
+        await memory_store.store_decision("retrain", "accuracy dropped", {}, doc_id="decision_1")
+
+    asyncio.run(store())
+
+    memories = memory_store.metadata_store.get_many(
+        list(memory_store.metadata_store.ids_for_doc_ids(["decision_1"]).values())
+    )
+    assert [memory["text"] for memory in memories.values()] == ["Decision: retrain. Reasoning: accuracy dropped"]
+
+
+def test_rehydrating_repeated_decisions_merges_them_once(memory_store, tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'aurora.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(
+            AgentDecision(agent_type="critic", decision_type="no_action", reasoning="metrics are stable")
+            for _ in range(5)
+        )
+        db.commit()
+
+    @contextmanager
+    def get_db():
+        with Session(engine) as db:
+            yield db
+            db.commit()
+
+    monkeypatch.setattr(rehydration, "get_db", get_db)
+
+    for _ in range(2):  # a restart finds every row already stored
+        rehydrator = Rehydrator(memory_store, chunk_size=2)
+        asyncio.run(rehydrator.run())
+        assert rehydrator.status == "ready"
+
+    assert memory_store.metadata_store.count() == 1
+    assert memory_store.deduplicated == 4
+    assert rehydrator.tables[AgentDecision.__tablename__]["added"] == 0
+    stored = memory_store.metadata_store.ids_for_doc_ids([decision_doc_id(i) for i in range(1, 6)])
+    [memory] = memory_store.metadata_store.get_many(list(stored.values())).values()
+    assert memory["occurrences"] == 5
+    engine.dispose()
@@ -0,0 +1,88 @@
+"""
+Memory index types: snapshots, deletes and searches over each base
+"""
+import asyncio
+
+import pytest
+
+from backend.config import settings
+from backend.rag.memory_store import MemoryStore
+
+TEXTS = [f"memory {i}: model m{i % 3} retrained after drift" for i in range(400)]
+DOC_IDS = [f"d{i}" for i in range(len(TEXTS))]
+
+
+@pytest.fixture
+def small_index_settings(monkeypatch):
+    """Index parameters small enough to train the quantized types on a few hundred vectors"""
+    monkeypatch.setattr(settings, "memory_dedup_threshold", 0.0)
+    monkeypatch.setattr(settings, "memory_recency_weight", 0.0)
+    monkeypatch.setattr(settings, "memory_ivf_nlist", 8)
+    monkeypatch.setattr(settings, "memory_pq_m", 8)
+    monkeypatch.setattr(settings, "memory_index_train_threshold", 100)
+
+
+def find_themselves(store: MemoryStore, deleted: set) -> list:
+    """Doc ids of remaining memories whose own text does not return them first"""
+    results = asyncio.run(store.search_many(TEXTS, top_k=1, mode="vector"))
+    return [
+        doc_id for doc_id, found in zip(DOC_IDS, results)
+        if doc_id not in deleted and (not found or found[0]["id"] != doc_id)
+    ]
+
+
+@pytest.mark.parametrize("index_type", ["ivf", "ivf_sq8", "ivf_pq"])
+def test_delete_from_ivf_base_keeps_ids_on_their_vectors(index_type, small_index_settings, monkeypatch, hash_encoder):
+    monkeypatch.setattr(settings, "memory_index_type", index_type)
+    store = MemoryStore(get_encoder=hash_encoder)
+    asyncio.run(store.store_many(TEXTS, [{"type": "note"}] * len(TEXTS), DOC_IDS))
+    assert store.snapshot() and store.index.base_type == index_type
+
+    asyncio.run(store.delete(["d5"]))
+    assert store.snapshot()
+
+    assert store.index.base.ntotal == len(TEXTS) - 1
+    assert find_themselves(store, {"d5"}) == []
+    asyncio.run(store.stop())
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf", "sq8", "pq", "ivf_sq8", "ivf_pq"])
+def test_store_snapshot_reopen_delete_search(index_type, small_index_settings, monkeypatch, tmp_path, hash_encoder):
+    monkeypatch.setattr(settings, "memory_index_type", index_type)
+    store = MemoryStore(get_encoder=hash_encoder, persist_dir=str(tmp_path))
+    asyncio.run(store.store_many(TEXTS, [{"type": "note"}] * len(TEXTS), DOC_IDS))
+    asyncio.run(store.stop())  # final snapshot
+
+    store = MemoryStore(get_encoder=hash_encoder, persist_dir=str(tmp_path))
+    assert store.index.base_type == index_type
+    assert store.index.base.ntotal == len(TEXTS)
+
+    deleted = {"d0", "d7", "d123"}
+    asyncio.run(store.delete(sorted(deleted)))
+    assert find_themselves(store, deleted) == []  # deleted vectors masked in the base
+
+    assert store.snapshot()
+    assert store.index.base.ntotal == len(TEXTS) - len(deleted)
+    assert find_themselves(store, deleted) == []
+    asyncio.run(store.stop())
+
+
+def test_base_migrates_online_when_index_type_changes(small_index_settings, monkeypatch, tmp_path, hash_encoder):
+    store = MemoryStore(get_encoder=hash_encoder, persist_dir=str(tmp_path))
+    asyncio.run(store.store_many(TEXTS[:50], [{"type": "note"}] * 50, DOC_IDS[:50]))
+    monkeypatch.setattr(settings, "memory_index_type", "ivf")
+    assert store.snapshot()
+    assert store.index.base_type == "flat"  # too few vectors to train yet
+
+    asyncio.run(store.store_many(TEXTS[50:], [{"type": "note"}] * 350, DOC_IDS[50:]))
+    assert store.snapshot()
+    assert store.index.base_type == "ivf"
+    asyncio.run(store.stop())
+
+    monkeypatch.setattr(settings, "memory_index_type", "hnsw")
+    store = MemoryStore(get_encoder=hash_encoder, persist_dir=str(tmp_path))
+    assert store.index.base_type == "ivf"  # the snapshot keeps serving until rebuilt
+    assert store.snapshot()
+    assert store.index.base_type == "hnsw"
+    assert find_themselves(store, set()) == []
+    asyncio.run(store.stop())
@@ -0,0 +1,47 @@
+"""
+Hybrid result ranking and search errors
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.config import settings
+from backend.rag.memory_store import MemoryStore, _rank
+
+NO_HITS = (np.array([], dtype=np.int64), np.array([], dtype=np.float32))
+
+
+def test_vector_similarity_kept_without_keyword_matches():
+    vector_hits = (np.array([3, 7]), np.array([0.91, 0.62], dtype=np.float32))
+
+    ranking = _rank(vector_hits, NO_HITS)
+
+    assert [memory_id for memory_id, _, _, _ in ranking] == [3, 7]
+    assert np.allclose([score for _, score, _, _ in ranking], [0.91, 0.62])
+    assert all(keyword_score is None for _, _, _, keyword_score in ranking)
+
+
+def test_both_lists_fused_with_raw_scores_kept():
+    vector_hits = (np.array([3, 7]), np.array([0.91, 0.62], dtype=np.float32))
+    keyword_hits = (np.array([7]), np.array([4.2], dtype=np.float32))
+
+    ranking = _rank(vector_hits, keyword_hits)
+
+    assert ranking[0][0] == 7  # found by both
+    assert ranking[0][1] < 2.0 / settings.memory_rrf_k  # fused, not a similarity
+    assert np.isclose(ranking[0][2], 0.62) and np.isclose(ranking[0][3], 4.2)
+
+
+class FailingEncoder:
+    def encode(self, sentences, batch_size=32, **kwargs):
+        raise RuntimeError("encoder unavailable")
+
+
+def test_search_failures_are_not_reported_as_no_results():
+    store = MemoryStore(get_encoder=FailingEncoder)
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(store.search_many(["model accuracy dropped"], mode="vector"))
+    finally:
+        asyncio.run(store.stop())
@@ -0,0 +1,87 @@
+"""
+Keyset pagination over (timestamp, id) on SQLite
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from backend.database.connection import _normalize_sqlite_timestamps
+from backend.database.models import Base, AgentDecision
+from backend.database.pagination import keyset_statement, keyset_page
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'aurora.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        # Default timestamps (as /api/analyze writes them) plus ties on one timestamp
+        db.add_all(AgentDecision(agent_type="planner", decision_type="no_action") for _ in range(7))
+        tied = datetime(2025, 1, 1, 12, 0, 0)
+        db.add_all(
+            AgentDecision(agent_type="planner", decision_type="retrain", timestamp=tied) for _ in range(4)
+        )
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def fetch_page(db, limit, before=None, after=None):
+    stmt = keyset_statement(
+        select(AgentDecision), AgentDecision.timestamp, AgentDecision.id, limit, before=before, after=after
+    )
+    rows = list(db.execute(stmt).scalars())
+    return keyset_page(rows, limit, before=before, after=after)
+
+
+def test_pages_are_disjoint_and_cover_every_row(session):
+    all_ids = [row.id for row in session.execute(
+        select(AgentDecision).order_by(AgentDecision.timestamp.desc(), AgentDecision.id.desc())
+    ).scalars()]
+
+    seen = []
+    cursor = None
+    for _ in range(len(all_ids)):
+        rows, cursor, _ = fetch_page(session, 2, before=cursor)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            break
+
+    assert seen == all_ids
+    assert len(set(seen)) == len(seen)
+
+
+def test_after_cursor_walks_back_to_newest(session):
+    rows, next_cursor, _ = fetch_page(session, 3)
+    newest = [row.id for row in rows]
+    older, _, prev_cursor = fetch_page(session, 3, before=next_cursor)
+    assert not set(newest) & {row.id for row in older}
+
+    rows, _, _ = fetch_page(session, 3, after=prev_cursor)
+    assert [row.id for row in rows] == newest
+
+
+def test_rejects_empty_pages(session):
+    with pytest.raises(ValueError):
+        fetch_page(session, 0)
+
+
+def test_legacy_sqlite_timestamps_are_normalized_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(engine)
+    insert = "INSERT INTO agent_decisions (agent_type, decision_type, timestamp) VALUES ('planner', 'retrain', ?)"
+    read = "SELECT timestamp FROM agent_decisions ORDER BY id"
+    with engine.begin() as conn:
+        conn.exec_driver_sql(insert, ("2025-01-01 12:00:00",))  # as the old server default wrote it
+
+    _normalize_sqlite_timestamps(engine)
+    with engine.begin() as conn:
+        assert conn.exec_driver_sql(read).scalars().all() == ["2025-01-01 12:00:00.000000"]
+        conn.exec_driver_sql(insert, ("2025-01-02 12:00:00",))
+
+    _normalize_sqlite_timestamps(engine)  # already migrated: no second scan
+    with engine.begin() as conn:
+        assert conn.exec_driver_sql(read).scalars().all()[-1] == "2025-01-02 12:00:00"
+    engine.dispose()
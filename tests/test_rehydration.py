@@ -0,0 +1,18 @@
+"""
+Rehydration status reporting
+"""
+from backend.rag.rehydration import Rehydrator
+
+
+def test_disabled_rehydration_reports_no_progress(memory_store):
+    progress = Rehydrator(memory_store, enabled=False).progress()
+
+    assert progress["status"] == "disabled"
+    assert progress["progress"] is None
+
+
+def test_pending_rehydration_reports_zero_progress(memory_store):
+    progress = Rehydrator(memory_store).progress()
+
+    assert progress["status"] == "idle"
+    assert progress["progress"] == 0.0